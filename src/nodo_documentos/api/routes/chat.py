@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from loguru import logger
 
 from nodo_documentos.api.dependencies import chat_service
+from nodo_documentos.api.routing import ORJSONRoute
 from nodo_documentos.api.schemas import ChatRequest, ChatResponse
 from nodo_documentos.services.chat_service import ChatService
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], route_class=ORJSONRoute)
 
 
 @router.post("", response_model=ChatResponse, status_code=status.HTTP_200_OK)
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends
 
 from nodo_documentos.api.dependencies import document_service
+from nodo_documentos.api.routing import ORJSONRoute
 from nodo_documentos.api.schemas import CI, DocumentResponse
 from nodo_documentos.services.document_service import DocumentService
 
-router = APIRouter(prefix="/clinical-history", tags=["clinical-history"])
+router = APIRouter(
+    prefix="/clinical-history", tags=["clinical-history"], route_class=ORJSONRoute
+)
 
 
 @router.get(
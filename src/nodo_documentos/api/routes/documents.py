@@ -2,8 +2,10 @@ import asyncio
 from uuid import uuid4
 
 from fastapi import APIRouter, BackgroundTasks, Depends, status
+from fastapi.concurrency import run_in_threadpool
 
 from nodo_documentos.api.dependencies import document_service, rag_service
+from nodo_documentos.api.routing import ORJSONRoute
 from nodo_documentos.api.schemas import (
     DocumentCreateRequest,
     DocumentResponse,
@@ -16,7 +18,7 @@ from nodo_documentos.services.rag_service import RAGService
 from nodo_documentos.services.settings import services_settings
 from nodo_documentos.utils.s3_utils import build_s3_uri, generate_presigned_put_url
 
-router = APIRouter(prefix="/documents", tags=["documents"])
+router = APIRouter(prefix="/documents", tags=["documents"], route_class=ORJSONRoute)
 
 
 def _sanitize_file_name(file_name: str) -> str:
@@ -76,7 +78,10 @@ async def create_document_upload_url(
 
     filename = _sanitize_file_name(payload.file_name)
     object_key = f"{payload.clinic_name}/{uuid4()}/{filename}"
-    presigned = generate_presigned_put_url(
+    # Signing is CPU-bound (and the first call builds the boto3 client), so keep
+    # it off the event loop
+    presigned = await run_in_threadpool(
+        generate_presigned_put_url,
         key=object_key,
         content_type=payload.content_type,
     )
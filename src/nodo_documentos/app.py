@@ -4,7 +4,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from loguru import logger
 
 # Add src directory to Python path for Vercel
@@ -31,7 +31,11 @@ from nodo_documentos.api.middleware import APIKeyMiddleware  # noqa: E402
 from nodo_documentos.api.router import api_router  # noqa: E402
 from nodo_documentos.utils.settings import api_settings  # noqa: E402
 
-app = FastAPI(title="Documentos Clinicos", version="0.1.0")
+app = FastAPI(
+    title="Documentos Clinicos",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 
 @app.exception_handler(Exception)
@@ -1,9 +1,20 @@
-from sqlalchemy import select
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from nodo_documentos.api.schemas import CI, LongString
 from nodo_documentos.db.models import Document
 
+# Built once at import so every call reuses the same statement (and its
+# compiled-cache entry) with only the bound CI changing.
+_LIST_BY_USER = (
+    select(Document)
+    .where(Document.health_user_ci == bindparam("health_user_ci"))
+    .order_by(Document.created_at.desc(), Document.doc_id.desc())
+)
+
 
 class DocumentRepository:
     """Data access layer for clinical documents."""
@@ -41,13 +52,29 @@ class DocumentRepository:
         await self._session.refresh(document)
         return document
 
+    async def bulk_create(self, rows: Iterable[Mapping[str, Any]]) -> list[Document]:
+        """
+        Persist several document rows with one multi-row INSERT ... RETURNING.
+
+        Args:
+            rows: Column values for each document, keyed like ``create``.
+
+        Returns:
+            The new documents, in the same order as ``rows``.
+        """
+
+        rows = list(rows)
+        if not rows:
+            return []
+
+        stmt = insert(Document).returning(Document, sort_by_parameter_order=True)
+        result = await self._session.scalars(stmt, rows)
+        return list(result.all())
+
     async def list_by_health_user(self, health_user_ci: CI) -> list[Document]:
         """Return every document for a specific patient ordered by creation time."""
 
-        stmt = (
-            select(Document)
-            .where(Document.health_user_ci == health_user_ci)
-            .order_by(Document.created_at.desc(), Document.doc_id.desc())
+        result = await self._session.scalars(
+            _LIST_BY_USER, {"health_user_ci": health_user_ci}
         )
-        result = await self._session.scalars(stmt)
         return list[Document](result.all())
@@ -37,6 +37,8 @@ def _create_async_engine() -> AsyncEngine:
         url,
         echo=db_settings.sqlalchemy_echo,
         poolclass=NullPool,  # Disable connection pooling for serverless
+        # Room for every compiled statement variant so none is recompiled
+        query_cache_size=1200,
     )
     logger.info("Async database engine initialized")
     return engine
@@ -1,9 +1,12 @@
+from .cache import EmbeddingCache, get_embedding_cache
 from .encoder import EmbeddingEncoder, get_encoder
 from .settings import Settings
 
 __all__ = [
+    "EmbeddingCache",
     "EmbeddingEncoder",
     "Settings",
+    "get_embedding_cache",
     "get_encoder",
     "get_settings",
 ]
@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+from loguru import logger
+
+from nodo_documentos.rag.encoding.settings import settings
+
+# Stay well below SQLite's bound-parameter limit on IN (...) lookups
+_LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store keyed by a content hash of the embedded text.
+
+    Vectors are stored as raw little-endian float32 blobs in SQLite and scoped
+    by model name, so switching embedding models never returns stale vectors.
+    """
+
+    def __init__(self, path: str | Path, model: str) -> None:
+        self._model = model
+        self._lock = threading.Lock()
+        # Indexing runs in background worker threads
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, "
+            "key BLOB NOT NULL, "
+            "vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        """Return the cached vector for a single key, if present."""
+
+        return self.lookup([key]).get(key)
+
+    def lookup(self, keys: Sequence[bytes]) -> dict[bytes, np.ndarray]:
+        """Return the cached vectors for the given keys (misses are omitted)."""
+
+        hits: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = list(keys[start : start + _LOOKUP_BATCH])
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings "
+                    f"WHERE model = ? AND key IN ({placeholders})",
+                    [self._model, *batch],
+                )
+                for key, blob in rows:
+                    hits[key] = np.frombuffer(blob, dtype="<f4")
+        return hits
+
+    def put_many(self, keys: Sequence[bytes], embeddings: np.ndarray) -> None:
+        """Store one vector per key in a single transaction."""
+
+        if len(keys) != len(embeddings):
+            raise ValueError("keys and embeddings must have the same length")
+
+        vectors = np.asarray(embeddings, dtype="<f4")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector) "
+                "VALUES (?, ?, ?)",
+                [
+                    (self._model, key, vector.tobytes())
+                    for key, vector in zip(keys, vectors, strict=True)
+                ],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the cached embedding store, or None when no path is configured."""
+
+    if not settings.embedding_cache_path:
+        return None
+
+    logger.debug(
+        "Opening embedding cache at {path}", path=settings.embedding_cache_path
+    )
+    return EmbeddingCache(settings.embedding_cache_path, settings.embedding_model)
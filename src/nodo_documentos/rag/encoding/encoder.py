@@ -1,6 +1,7 @@
 from functools import lru_cache
 from typing import Sequence
 
+import numpy as np
 from loguru import logger
 from openai import OpenAI
 
@@ -12,8 +13,8 @@ class EmbeddingEncoder:
         self._model = settings.embedding_model
         self._client = OpenAI(api_key=settings.openai_api_key)
 
-    def embed(self, text: str) -> list[float]:
-        """Return the embedding vector for a single text input."""
+    def embed(self, text: str) -> np.ndarray:
+        """Return the float32 embedding vector for a single text input."""
 
         if not text:
             raise ValueError("text must not be empty")
@@ -21,15 +22,14 @@ class EmbeddingEncoder:
         logger.debug("Embedding text")
 
         response = self._client.embeddings.create(model=self._model, input=[text])
-        vector = response.data[0].embedding
-        return list(vector)
+        return np.asarray(response.data[0].embedding, np.float32)
 
     def embed_many(
         self,
         texts: Sequence[str],
         *,
         batch_size: int = 64,
-    ) -> list[list[float]]:
+    ) -> np.ndarray:
         """
         Return embedding vectors for multiple text inputs.
 
@@ -38,24 +38,27 @@ class EmbeddingEncoder:
             batch_size: Maximum number of strings to send per API call.
 
         Returns:
-            List of embedding vectors aligned with the input order.
+            C-contiguous float32 array of shape (len(texts), dim) aligned with
+            the input order.
         """
         texts = list(texts)
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
 
         logger.debug(f"Embedding {len(texts)} texts (batch_size={batch_size})")
 
-        vectors: list[list[float]] = []
+        batches: list[np.ndarray] = []
         for start in range(0, len(texts), batch_size):
             batch = texts[start : start + batch_size]
             response = self._client.embeddings.create(
                 model=self._model,
                 input=batch,
             )
-            vectors.extend(list(item.embedding) for item in response.data)
+            batches.append(
+                np.asarray([item.embedding for item in response.data], np.float32)
+            )
 
-        return vectors
+        return np.concatenate(batches)
 
 
 @lru_cache
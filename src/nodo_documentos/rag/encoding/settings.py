@@ -6,6 +6,8 @@ class Settings(BaseSettings):
 
     openai_api_key: str = ""
     embedding_model: str = "text-embedding-3-small"
+    # SQLite file for the persistent embedding cache; empty disables it
+    embedding_cache_path: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env",
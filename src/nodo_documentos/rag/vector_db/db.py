@@ -2,15 +2,20 @@ from functools import lru_cache
 from typing import Sequence
 from uuid import uuid4
 
+import numpy as np
 from loguru import logger
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
     FieldCondition,
     Filter,
+    FilterSelector,
     MatchValue,
     PayloadSchemaType,
     PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
     ScoredPoint,
     VectorParams,
 )
@@ -72,10 +77,20 @@ class VectorDB:
                     size=self._settings.vector_size,
                     distance=Distance.COSINE,
                 ),
+                quantization_config=self._build_quantization_config(),
             )
 
         self._ensure_payload_indexes()
 
+    def _build_quantization_config(self) -> ScalarQuantization | None:
+        """Return the int8 scalar quantization config if enabled in settings."""
+        if not self._settings.scalar_quantization:
+            return None
+
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+        )
+
     def _ensure_payload_indexes(self) -> None:
         """Create payload indexes for fields used in queries."""
         client = self._get_client()
@@ -119,9 +134,9 @@ class VectorDB:
         self,
         document: ParsedDocument,
         chunks: Sequence[ClinicalDocumentChunk],
-        embeddings: Sequence[Sequence[float]],
+        embeddings: np.ndarray,
     ) -> None:
-        """Upsert chunk embeddings for a document into Qdrant."""
+        """Upsert chunk embeddings (an (N, dim) array) for a document into Qdrant."""
 
         if len(chunks) != len(embeddings):
             raise ValueError("chunks and embeddings must have the same length")
@@ -129,37 +144,43 @@ class VectorDB:
         # Ensure collection exists before indexing
         self.ensure_collection()
 
-        points = [
+        # Convert the whole matrix in one C-level pass instead of per row
+        vectors = np.asarray(embeddings, dtype=np.float32).tolist()
+        points = (
             self._build_point(chunk=chunk, vector=vector)
-            for chunk, vector in zip(chunks, embeddings, strict=True)
-        ]
+            for chunk, vector in zip(chunks, vectors, strict=True)
+        )
 
         logger.info(
             "Upserting {count} chunks for document={document}",
-            count=len(points),
+            count=len(chunks),
             document=document.document_name,
         )
-        self._get_client().upsert(
+        # Points are built lazily and sent in fixed-size batches; wait=True
+        # keeps upsert's read-after-write guarantee for callers.
+        self._get_client().upload_points(
             collection_name=self._collection,
             points=points,
+            batch_size=self._settings.upsert_batch_size,
+            wait=True,
         )
 
     def _build_point(
         self,
         chunk: ClinicalDocumentChunk,
-        vector: Sequence[float],
+        vector: list[float],
     ) -> PointStruct:
         point_id = str(uuid4())
         payload = chunk.model_dump()
 
-        return PointStruct(id=point_id, vector=list(vector), payload=payload)
+        return PointStruct(id=point_id, vector=vector, payload=payload)
 
     # ------------------------------------------------------------------
     # Querying
     # ------------------------------------------------------------------
     def search(
         self,
-        embedding: Sequence[float],
+        embedding: Sequence[float] | np.ndarray,
         *,
         limit: int = 10,
         health_user_ci: str,
@@ -187,7 +208,7 @@ class VectorDB:
 
         response = self._get_client().query_points(
             collection_name=self._collection,
-            query=list(embedding),
+            query=np.asarray(embedding, dtype=np.float32).tolist(),
             limit=limit,
             query_filter=query_filter,
             with_payload=True,
@@ -237,6 +258,37 @@ class VectorDB:
         points, _ = results
         return list(points)  # type: ignore
 
+    def count_chunks(self, document_id: str) -> int:
+        """Return how many chunks are stored for a document (server-side count)."""
+
+        query_filter = Filter(
+            must=[
+                FieldCondition(key="document_id", match=MatchValue(value=document_id))
+            ]
+        )
+
+        result = self._get_client().count(
+            collection_name=self._collection,
+            count_filter=query_filter,
+            exact=True,
+        )
+        return result.count
+
+    def delete_document(self, document_id: str) -> None:
+        """Remove every chunk stored for a document."""
+
+        query_filter = Filter(
+            must=[
+                FieldCondition(key="document_id", match=MatchValue(value=document_id))
+            ]
+        )
+
+        self._get_client().delete(
+            collection_name=self._collection,
+            points_selector=FilterSelector(filter=query_filter),
+            wait=True,
+        )
+
 
 @lru_cache
 def get_vector_db() -> VectorDB:
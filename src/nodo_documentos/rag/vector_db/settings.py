@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     collection_name: str = "clinical-documents"
     vector_size: int = 1536
     timeout_seconds: int = 30
+    # Store an int8 copy of every vector (4x smaller) for search; originals are
+    # kept for rescoring. Only applied when the collection is first created.
+    scalar_quantization: bool = False
+    # Points sent per request when indexing a document
+    upsert_batch_size: int = 128
 
     model_config = SettingsConfigDict(
         env_file=".env",
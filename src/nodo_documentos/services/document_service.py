@@ -1,3 +1,6 @@
+from collections.abc import Iterable, Mapping
+from typing import Any
+
 from nodo_documentos.api.schemas import CI, LongString
 from nodo_documentos.db.models import Document
 from nodo_documentos.db.repos.document import DocumentRepository
@@ -36,6 +39,13 @@ class DocumentService:
             content=content,
         )
 
+    async def create_documents(
+        self, rows: Iterable[Mapping[str, Any]]
+    ) -> list[Document]:
+        """Register several documents at once, returned in input order."""
+
+        return await self._document_repo.bulk_create(rows)
+
     async def list_documents_for_health_user(
         self, health_user_ci: CI
     ) -> list[Document]:
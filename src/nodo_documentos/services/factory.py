@@ -16,6 +16,7 @@ def get_document_service(session: AsyncSession) -> DocumentService:
 def get_rag_service() -> RAGService:
     """Factory helper for the RAG service (no SQL session needed)."""
     from nodo_documentos.rag.chunking.chunker import get_chunker
+    from nodo_documentos.rag.encoding.cache import get_embedding_cache
     from nodo_documentos.rag.encoding.encoder import get_encoder
     from nodo_documentos.rag.parsing.parser import get_parser
     from nodo_documentos.rag.vector_db.db import get_vector_db
@@ -25,7 +26,13 @@ def get_rag_service() -> RAGService:
     pdf_chunker = get_chunker()
     encoder = get_encoder()
 
-    return RAGService(vector_db, pdf_parser, pdf_chunker, encoder)
+    return RAGService(
+        vector_db,
+        pdf_parser,
+        pdf_chunker,
+        encoder,
+        embedding_cache=get_embedding_cache(),
+    )
 
 
 def get_chat_service() -> ChatService:
@@ -1,4 +1,4 @@
-from pydantic import Field
+from pydantic import ConfigDict, Field
 
 from nodo_documentos.rag.chunking.models import Chunk
 
@@ -17,3 +17,6 @@ class ClinicalDocumentChunk(Chunk):
         description="Clinic name - which clinic manages the document"
     )
     created_by: str = Field(description="Uploader CI - who uploaded the document")
+
+    # Built once per indexing run and never mutated afterwards
+    model_config = ConfigDict(frozen=True)
@@ -1,16 +1,41 @@
 import tempfile
+from hashlib import blake2b
 from pathlib import Path
 
+import numpy as np
 from loguru import logger
+from pydantic import TypeAdapter
 
 from nodo_documentos.db.models import Document
 from nodo_documentos.rag.chunking.chunker import PDFChunker
+from nodo_documentos.rag.chunking.models import Chunk
+from nodo_documentos.rag.encoding.cache import EmbeddingCache
 from nodo_documentos.rag.encoding.encoder import EmbeddingEncoder
 from nodo_documentos.rag.parsing.parser import PDFParser
 from nodo_documentos.rag.vector_db.db import VectorDB
 from nodo_documentos.services.models import ClinicalDocumentChunk
 from nodo_documentos.utils.s3_utils import download_from_s3
 
+# Validates a whole document's chunks in a single pydantic-core call
+_CLINICAL_CHUNKS = TypeAdapter(list[ClinicalDocumentChunk])
+
+
+def build_clinical_chunks(
+    base_chunks: list[Chunk], document: Document
+) -> list[ClinicalDocumentChunk]:
+    """Attach the document's ownership metadata to each parsed chunk."""
+
+    # document_id is replaced with the SQL Document ID
+    ownership = {
+        "document_id": str(document.doc_id),
+        "health_user_ci": document.health_user_ci,
+        "clinic_name": document.clinic_name,
+        "created_by": document.created_by,
+    }
+    return _CLINICAL_CHUNKS.validate_python(
+        [{**chunk.__dict__, **ownership} for chunk in base_chunks]
+    )
+
 
 class RAGService:
     def __init__(
@@ -19,11 +44,13 @@ class RAGService:
         pdf_parser: PDFParser,
         pdf_chunker: PDFChunker,
         encoder: EmbeddingEncoder,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
         self._vector_db = vector_db
         self._pdf_parser = pdf_parser
         self._pdf_chunker = pdf_chunker
         self._encoder = encoder
+        self._embedding_cache = embedding_cache
 
     async def index_document(self, document: Document) -> None:
         """
@@ -36,7 +63,9 @@ class RAGService:
             document: SQL Document model containing S3 URL and ownership info
 
         """
-        logger.info(f"Starting RAG indexing for document {document.doc_id}")
+        logger.info(
+            "Starting RAG indexing for document {doc_id}", doc_id=document.doc_id
+        )
 
         # Skip indexing if document doesn't have an S3 URL
         if not document.s3_url:
@@ -47,7 +76,9 @@ class RAGService:
 
         temp_file_path = None
         try:
-            logger.debug(f"Downloading PDF from {document.s3_url}")
+            logger.opt(lazy=True).debug(
+                "Downloading PDF from {url}", url=lambda: document.s3_url
+            )
             pdf_bytes = download_from_s3(document.s3_url)
 
             with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
@@ -60,29 +91,21 @@ class RAGService:
             logger.debug("Chunking parsed document")
             base_chunks = self._pdf_chunker.chunk_document(parsed_doc)
 
-            clinical_chunks = []
-            for chunk in base_chunks:
-                # Update document_id to match the SQL Document ID
-                chunk_dict = chunk.model_dump()
-                chunk_dict["document_id"] = str(document.doc_id)
-                clinical_chunk = ClinicalDocumentChunk(
-                    **chunk_dict,
-                    health_user_ci=document.health_user_ci,
-                    clinic_name=document.clinic_name,
-                    created_by=document.created_by,
-                )
-                clinical_chunks.append(clinical_chunk)
+            clinical_chunks = build_clinical_chunks(base_chunks, document)
 
-            logger.debug(f"Generating embeddings for {len(clinical_chunks)} chunks")
+            logger.debug(
+                "Generating embeddings for {count} chunks", count=len(clinical_chunks)
+            )
             texts = [chunk.text for chunk in clinical_chunks]
-            embeddings = self._encoder.embed_many(texts)
+            embeddings = self._embed_texts(texts)
 
             logger.debug("Storing chunks and embeddings in vector database")
             self._vector_db.index_document(parsed_doc, clinical_chunks, embeddings)
 
             logger.success(
-                f"Successfully indexed document {document.doc_id}: "
-                f"{len(clinical_chunks)} chunks stored"
+                "Successfully indexed document {doc_id}: {count} chunks stored",
+                doc_id=document.doc_id,
+                count=len(clinical_chunks),
             )
 
         except Exception as e:
@@ -96,3 +119,68 @@ class RAGService:
         finally:
             if temp_file_path and temp_file_path.exists():
                 temp_file_path.unlink()
+
+    def _embed_texts(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts, sending each distinct text to the encoder only once.
+
+        Repeated boilerplate (headers, footers, consent forms) is common in
+        clinical PDFs, so chunks are keyed by a content hash and the vectors of
+        the unique texts are scattered back to every position. When an
+        embedding cache is configured, texts seen in earlier documents skip the
+        encoder entirely.
+
+        Args:
+            texts: Chunk texts in document order
+
+        Returns:
+            float32 array of shape (len(texts), dim) aligned with the input
+        """
+        slots: dict[bytes, int] = {}
+        unique_texts: list[str] = []
+        inverse = np.empty(len(texts), dtype=np.intp)
+
+        for i, text in enumerate(texts):
+            digest = blake2b(text.encode(), digest_size=16).digest()
+            slot = slots.setdefault(digest, len(unique_texts))
+            if slot == len(unique_texts):
+                unique_texts.append(text)
+            inverse[i] = slot
+
+        if len(unique_texts) < len(texts):
+            logger.debug(
+                "Skipping {count} duplicate chunk texts",
+                count=len(texts) - len(unique_texts),
+            )
+
+        digests = list(slots)
+        cached = self._embedding_cache.lookup(digests) if self._embedding_cache else {}
+        missing = [i for i, digest in enumerate(digests) if digest not in cached]
+
+        if not cached:
+            unique_embeddings = self._encode(unique_texts)
+        else:
+            logger.debug(
+                "Embedding cache hits: {hits}/{total}",
+                hits=len(cached),
+                total=len(digests),
+            )
+            dim = len(next(iter(cached.values())))
+            unique_embeddings = np.empty((len(digests), dim), dtype=np.float32)
+            for i, digest in enumerate(digests):
+                if digest in cached:
+                    unique_embeddings[i] = cached[digest]
+            if missing:
+                unique_embeddings[missing] = self._encode(
+                    [unique_texts[i] for i in missing]
+                )
+
+        if self._embedding_cache and missing:
+            self._embedding_cache.put_many(
+                [digests[i] for i in missing], unique_embeddings[missing]
+            )
+
+        return unique_embeddings[inverse]
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return np.ascontiguousarray(self._encoder.embed_many(texts), dtype=np.float32)
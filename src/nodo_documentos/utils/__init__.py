@@ -1,13 +1,25 @@
 from .s3_utils import (
+    S3_URI_PREFIX,
+    Boto3Presigner,
     PresignedUrl,
+    Presigner,
     build_s3_uri,
     create_s3_client,
     generate_presigned_put_url,
+    get_presigner,
+    get_s3_client,
+    set_presigner,
 )
 
 __all__ = [
+    "S3_URI_PREFIX",
+    "Boto3Presigner",
     "PresignedUrl",
+    "Presigner",
     "build_s3_uri",
     "create_s3_client",
     "generate_presigned_put_url",
+    "get_presigner",
+    "get_s3_client",
+    "set_presigner",
 ]
@@ -1,4 +1,7 @@
+import time
 import urllib.parse
+from functools import lru_cache
+from typing import Protocol
 
 import boto3
 import httpx
@@ -7,6 +10,16 @@ from pydantic import BaseModel
 
 from nodo_documentos.utils.settings import s3_settings
 
+# The bucket is fixed for the lifetime of the process, so the URI prefix is
+# built once instead of on every upload.
+_BUCKET = s3_settings.bucket_name
+S3_URI_PREFIX = f"s3://{_BUCKET}/"
+
+# Presigned GET URLs are reused while at least half of their lifetime remains,
+# so listing many documents does not re-sign the same key on every response.
+_GET_URL_CACHE_SIZE = 4096
+_get_url_cache: dict[tuple[str, int], tuple[str, float]] = {}
+
 
 class PresignedUrl(BaseModel):
     url: str
@@ -23,10 +36,73 @@ def create_s3_client() -> BaseClient:
     )
 
 
+@lru_cache
+def get_s3_client() -> BaseClient:
+    """Return a cached S3 client (boto3 clients are thread-safe)."""
+
+    return create_s3_client()
+
+
+class Presigner(Protocol):
+    """Signs object URLs for the configured bucket."""
+
+    def get(self, key: str, expires_in: int) -> str: ...
+
+    def put(
+        self, key: str, expires_in: int, content_type: str | None = None
+    ) -> str: ...
+
+
+class Boto3Presigner:
+    """Presigner backed by the cached boto3 client."""
+
+    def __init__(self, client: BaseClient, bucket: str) -> None:
+        self._presign = client.generate_presigned_url
+        self._bucket = bucket
+
+    def get(self, key: str, expires_in: int) -> str:
+        return self._presign(
+            ClientMethod="get_object",
+            Params={"Bucket": self._bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def put(self, key: str, expires_in: int, content_type: str | None = None) -> str:
+        params: dict[str, str] = {"Bucket": self._bucket, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+
+        return self._presign(
+            ClientMethod="put_object",
+            Params=params,
+            ExpiresIn=expires_in,
+        )
+
+
+_presigner: Presigner | None = None
+
+
+def get_presigner() -> Presigner:
+    """Return the active presigner, creating the boto3 one on first use."""
+
+    global _presigner
+    if _presigner is None:
+        _presigner = Boto3Presigner(get_s3_client(), _BUCKET)
+    return _presigner
+
+
+def set_presigner(presigner: Presigner | None) -> None:
+    """Replace the active presigner; ``None`` restores the boto3 default."""
+
+    global _presigner
+    _presigner = presigner
+    _get_url_cache.clear()
+
+
 def build_s3_uri(key: str) -> str:
-    """Return the canonical S3 URI for a given object key."""
+    """Return the canonical S3 URI for a given object key (percent-encoded)."""
 
-    return f"s3://{s3_settings.bucket_name}/{key}"
+    return S3_URI_PREFIX + urllib.parse.quote(key, safe="/")
 
 
 def generate_presigned_put_url(
@@ -42,21 +118,8 @@ def generate_presigned_put_url(
     optional content-type header the front-end might need to send.
     """
 
-    client = create_s3_client()
-    params: dict[str, str] = {
-        "Bucket": s3_settings.bucket_name,
-        "Key": key,
-    }
-    if content_type:
-        params["ContentType"] = content_type
-
     expiration = expires_in or s3_settings.presigned_expiration_seconds
-
-    url = client.generate_presigned_url(
-        ClientMethod="put_object",
-        Params=params,
-        ExpiresIn=expiration,
-    )
+    url = get_presigner().put(key, expiration, content_type)
     return PresignedUrl(url=url, expires_in=expiration)
 
 
@@ -96,6 +159,8 @@ def generate_presigned_get_url(
     Create a presigned URL that allows downloading an object via HTTP GET.
 
     Either s3_url or key must be provided. If both are provided, key takes precedence.
+    A URL signed earlier for the same key is reused while at least half of its
+    lifetime remains; the returned expires_in is the time it has left.
 
     Args:
         s3_url: S3 URL in format "s3://bucket/key"
@@ -111,19 +176,20 @@ def generate_presigned_get_url(
     if not key:
         key = extract_key_from_s3_uri(s3_url)
 
-    client = create_s3_client()
-    params: dict[str, str] = {
-        "Bucket": s3_settings.bucket_name,
-        "Key": key,
-    }
-
     expiration = expires_in or s3_settings.presigned_expiration_seconds
-
-    url = client.generate_presigned_url(
-        ClientMethod="get_object",
-        Params=params,
-        ExpiresIn=expiration,
-    )
+    now = time.monotonic()
+
+    cached = _get_url_cache.get((key, expiration))
+    if cached is not None:
+        url, signed_at = cached
+        remaining = expiration - (now - signed_at)
+        if remaining >= expiration / 2:
+            return PresignedUrl(url=url, expires_in=int(remaining))
+
+    url = get_presigner().get(key, expiration)
+    if len(_get_url_cache) >= _GET_URL_CACHE_SIZE:
+        _get_url_cache.pop(next(iter(_get_url_cache)))
+    _get_url_cache[(key, expiration)] = (url, now)
     return PresignedUrl(url=url, expires_in=expiration)
 
 
@@ -153,8 +219,7 @@ def download_from_s3(s3_url: str) -> bytes:
         bucket, _ = path_part.split("/", 1)
         key = extract_key_from_s3_uri(s3_url)
 
-        client = create_s3_client()
-        response = client.get_object(Bucket=bucket, Key=key)
+        response = get_s3_client().get_object(Bucket=bucket, Key=key)
         return response["Body"].read()
 
     # Handle HTTPS presigned URLs
@@ -2,17 +2,16 @@ from urllib.parse import quote
 
 import pytest
 
-from nodo_documentos.utils.s3_utils import PresignedUrl
+from nodo_documentos.utils.s3_utils import S3_URI_PREFIX
 from nodo_documentos.utils.settings import s3_settings
 
+pytestmark = pytest.mark.usefixtures("presigner")
+
 
 @pytest.mark.asyncio
-async def test_create_document(async_client, monkeypatch):
+async def test_create_document(async_client, presigner):
     expected_presigned_url = "https://s3.amazonaws.com/bucket/doc-1?signature=test"
-    monkeypatch.setattr(
-        "nodo_documentos.utils.s3_utils.generate_presigned_get_url",
-        lambda **kwargs: PresignedUrl(url=expected_presigned_url, expires_in=600),
-    )
+    presigner.get_url = expected_presigned_url
 
     payload = {
         "created_by": "12345678",
@@ -31,13 +30,10 @@ async def test_create_document(async_client, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_create_document_with_hcen_aliases(async_client, monkeypatch):
+async def test_create_document_with_hcen_aliases(async_client, presigner):
     """Test that HCEN field names (health_worker_ci, content_url) work correctly."""
     expected_presigned_url = "https://s3.amazonaws.com/bucket/doc-2?signature=abc123"
-    monkeypatch.setattr(
-        "nodo_documentos.utils.s3_utils.generate_presigned_get_url",
-        lambda **kwargs: PresignedUrl(url=expected_presigned_url, expires_in=600),
-    )
+    presigner.get_url = expected_presigned_url
 
     payload = {
         "health_worker_ci": "12345678",  # Alias for created_by
@@ -60,7 +56,7 @@ async def test_create_document_with_hcen_aliases(async_client, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_create_presigned_upload_url(async_client, monkeypatch):
+async def test_create_presigned_upload_url(async_client, monkeypatch, presigner):
     fake_uuid = "11111111-2222-3333-4444-555555555555"
     clinic_name = "Test Clinic"
     expected_key = f"{clinic_name}/{fake_uuid}/document.pdf"
@@ -69,10 +65,7 @@ async def test_create_presigned_upload_url(async_client, monkeypatch):
         "nodo_documentos.api.routes.documents.uuid4",
         lambda: fake_uuid,
     )
-    monkeypatch.setattr(
-        "nodo_documentos.api.routes.documents.generate_presigned_put_url",
-        lambda **_: PresignedUrl(url=expected_url, expires_in=600),
-    )
+    presigner.put_url = expected_url
 
     response = await async_client.post(
         "/api/documents/upload-url",
@@ -87,30 +80,23 @@ async def test_create_presigned_upload_url(async_client, monkeypatch):
     payload = response.json()
     assert payload["object_key"] == expected_key
     # S3 URI should have URL-encoded spaces in the key
-    expected_s3_url = f"s3://{s3_settings.bucket_name}/{quote(expected_key, safe='/')}"
+    expected_s3_url = S3_URI_PREFIX + quote(expected_key, safe="/")
     assert payload["s3_url"] == expected_s3_url
     assert payload["upload_url"] == expected_url
-    assert payload["expires_in_seconds"] == 600
+    assert payload["expires_in_seconds"] == s3_settings.presigned_expiration_seconds
+    assert presigner.put_keys[-1] == expected_key
 
 
 @pytest.mark.asyncio
-async def test_presigned_upload_url_sanitizes_filename(async_client, monkeypatch):
+async def test_presigned_upload_url_sanitizes_filename(
+    async_client, monkeypatch, presigner
+):
     fake_uuid = "aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee"
     clinic_name = "Another Clinic"
     monkeypatch.setattr(
         "nodo_documentos.api.routes.documents.uuid4",
         lambda: fake_uuid,
     )
-    captured: dict[str, str] = {}
-
-    def _fake_presign(**kwargs):
-        captured["key"] = kwargs["key"]
-        return PresignedUrl(url="https://example.com", expires_in=900)
-
-    monkeypatch.setattr(
-        "nodo_documentos.api.routes.documents.generate_presigned_put_url",
-        _fake_presign,
-    )
 
     response = await async_client.post(
         "/api/documents/upload-url",
@@ -122,19 +108,15 @@ async def test_presigned_upload_url_sanitizes_filename(async_client, monkeypatch
     )
 
     assert response.status_code == 201
-    assert captured["key"].endswith("/report.pdf")
+    assert presigner.put_keys[-1].endswith("/report.pdf")
 
 
 @pytest.mark.asyncio
-async def test_content_url_is_presigned_https_url(async_client, monkeypatch):
+async def test_content_url_is_presigned_https_url(async_client, presigner):
     """Test that content_url is automatically converted to presigned HTTPS URL."""
     s3_uri = "s3://test-bucket/clinic/doc.pdf"
     expected_presigned_url = "https://s3.amazonaws.com/test-bucket/clinic/doc.pdf?X-Amz-Signature=xyz"
-    
-    monkeypatch.setattr(
-        "nodo_documentos.utils.s3_utils.generate_presigned_get_url",
-        lambda **kwargs: PresignedUrl(url=expected_presigned_url, expires_in=600),
-    )
+    presigner.get_url = expected_presigned_url
 
     payload = {
         "created_by": "12345678",
@@ -172,13 +154,10 @@ async def test_content_url_is_none_when_no_s3_url(async_client):
 
 
 @pytest.mark.asyncio
-async def test_clinical_history_returns_presigned_urls(async_client, monkeypatch):
+async def test_clinical_history_returns_presigned_urls(async_client, presigner):
     """Test that clinical history endpoint returns presigned URLs for content_url."""
     expected_presigned_url = "https://s3.amazonaws.com/bucket/doc.pdf?signature=test123"
-    monkeypatch.setattr(
-        "nodo_documentos.utils.s3_utils.generate_presigned_get_url",
-        lambda **kwargs: PresignedUrl(url=expected_presigned_url, expires_in=600),
-    )
+    presigner.get_url = expected_presigned_url
 
     # Create a document first
     create_response = await async_client.post(
@@ -1,52 +1,145 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import os
+from collections.abc import AsyncIterator, Callable, Iterator
+from functools import lru_cache
 
+import httpx
+import pytest
 import pytest_asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+from nodo_documentos.api.dependencies import rag_service
 from nodo_documentos.api.router import api_router
 from nodo_documentos.db.models import Base
 from nodo_documentos.db.session import get_async_session
+from nodo_documentos.utils.s3_utils import set_presigner
 
 
-@pytest_asyncio.fixture
-async def async_session() -> AsyncIterator[AsyncSession]:
-    """
-    Provides a fresh in-memory SQLite DB and async session per test.
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--slow",
+        action="store_true",
+        default=False,
+        help="run the full S3 → OCR → embedding pipeline in integration tests",
+    )
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        default=False,
+        help="run tests that need external services (Qdrant, Cerebras, a server)",
+    )
+    parser.addoption(
+        "--run-perf",
+        action="store_true",
+        default=False,
+        help="run time and memory budget tests",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    # Skip before fixture setup so gated tests never build real RAG components
+    skips: dict[str, pytest.MarkDecorator] = {}
+    if not config.getoption("--slow"):
+        skips["slow"] = pytest.mark.skip(reason="slow test; run with --slow")
+    if not config.getoption("--run-integration"):
+        skips["integration"] = pytest.mark.skip(reason="needs --run-integration")
+    if not config.getoption("--run-perf"):
+        skips["perf"] = pytest.mark.skip(reason="needs --run-perf")
+
+    for item in items:
+        for name, skip in skips.items():
+            if item.get_closest_marker(name):
+                item.add_marker(skip)
 
-    Using SQLite keeps tests lightweight while still exercising the SQLAlchemy
-    ORM logic used by our repositories.
-    """
 
+def _create_sqlite_engine() -> AsyncEngine:
+    # A single pooled connection to a shared-cache in-memory database: every
+    # test reuses it instead of opening a new connection and schema.
+    # Named per pytest-xdist worker so parallel workers never share a database.
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
     engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        future=True,
+        f"sqlite+aiosqlite:///file:memdb_{worker}?mode=memory&cache=shared&uri=true",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False, "uri": True},
     )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINTs; let
+    # SQLAlchemy emit BEGIN itself so per-test rollbacks really isolate tests.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def engine() -> AsyncIterator[AsyncEngine]:
+    """
+    Test engine whose schema is created once for the whole run.
+
+    Defaults to in-memory SQLite, which keeps tests lightweight while still
+    exercising the SQLAlchemy ORM logic used by our repositories. Set
+    TEST_DATABASE_URL (e.g. a postgresql+asyncpg:// URL) to run the same suite
+    against a real database.
+    """
+
+    url = os.environ.get("TEST_DATABASE_URL")
+    engine = create_async_engine(url) if url else _create_sqlite_engine()
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    session_factory = async_sessionmaker(
-        engine,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-    async with session_factory() as session:
-        yield session
-        await session.rollback()
+    yield engine
 
     await engine.dispose()
 
 
-@pytest_asyncio.fixture
-async def test_app(async_session: AsyncSession) -> AsyncIterator[FastAPI]:
-    """FastAPI app instance bound to the ephemeral SQLite session."""
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    """
+    Async session wrapped in a transaction that is rolled back after each test.
+
+    The session joins an outer connection-level transaction through a
+    SAVEPOINT, so commits made by the code under test never escape it.
+    """
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@lru_cache(maxsize=1)
+def _build_app() -> FastAPI:
+    """Build the test app once; per-test state lives in dependency overrides."""
+
+    app = FastAPI(
+        title="Documentos Clinicos",
+        version="0.1.0",
+        default_response_class=ORJSONResponse,
+    )
 
-    app = FastAPI(title="Documentos Clinicos", version="0.1.0")
-    
     @app.get("/")
     async def root():
         return {"status": "ok", "service": "nodo-documentos"}
@@ -58,20 +151,106 @@ async def test_app(async_session: AsyncSession) -> AsyncIterator[FastAPI]:
     # Include router but skip API key middleware for tests
     app.include_router(api_router, prefix="/api")
 
+    return app
+
+
+@pytest.fixture(scope="session")
+def asgi_app() -> FastAPI:
+    """FastAPI app shared by every test in the run."""
+
+    return _build_app()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def asgi_client(asgi_app: FastAPI) -> AsyncIterator[AsyncClient]:
+    """HTTP client kept open for the whole run against the shared app."""
+
+    transport = ASGITransport(app=asgi_app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def test_app(
+    asgi_app: FastAPI, async_session: AsyncSession
+) -> AsyncIterator[FastAPI]:
+    """Shared FastAPI app bound to this test's ephemeral SQLite session."""
+
     async def _override_session():
         yield async_session
 
-    app.dependency_overrides[get_async_session] = _override_session
+    asgi_app.dependency_overrides[get_async_session] = _override_session
+
+    yield asgi_app
+
+    asgi_app.dependency_overrides.pop(get_async_session, None)
+
 
-    yield app
+@pytest.fixture
+def override_rag(test_app: FastAPI) -> Iterator[Callable[[object], None]]:
+    """Setter that swaps the app's RAG service; always undone at teardown."""
 
-    app.dependency_overrides.clear()
+    def _set(instance: object) -> None:
+        test_app.dependency_overrides[rag_service] = lambda: instance
 
+    yield _set
 
-@pytest_asyncio.fixture
-async def async_client(test_app: FastAPI) -> AsyncIterator[AsyncClient]:
+    test_app.dependency_overrides.pop(rag_service, None)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_client(test_app: FastAPI, asgi_client: AsyncClient) -> AsyncClient:
     """HTTP client backed by the test FastAPI app."""
 
-    transport = ASGITransport(app=test_app)
-    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+    return asgi_client
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Pooled client for real network calls (S3 uploads, live servers)."""
+
+    async with httpx.AsyncClient(
+        timeout=120.0,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    ) as client:
         yield client
+
+
+class FakePresigner:
+    """In-memory presigner that returns fixed URLs and records each signing."""
+
+    def __init__(self) -> None:
+        self.get_url = "https://s3.example.com/object?X-Amz-Signature=test"
+        self.put_url = "https://s3.example.com/upload?X-Amz-Signature=test"
+        self.get_keys: list[str] = []
+        self.put_keys: list[str] = []
+        self.expires_in: list[int] = []
+        self.content_types: list[str | None] = []
+
+    def get(self, key: str, expires_in: int) -> str:
+        self.get_keys.append(key)
+        self.expires_in.append(expires_in)
+        return self.get_url
+
+    def put(self, key: str, expires_in: int, content_type: str | None = None) -> str:
+        self.put_keys.append(key)
+        self.expires_in.append(expires_in)
+        self.content_types.append(content_type)
+        return self.put_url
+
+
+@pytest.fixture
+def presigner() -> Iterator[FakePresigner]:
+    """
+    Install a fresh fake presigner so no test signs URLs through boto3.
+
+    Installing it also clears the cached presigned GET URLs, so a test never
+    sees a URL signed by an earlier test's fake.
+    """
+
+    fake = FakePresigner()
+    set_presigner(fake)
+    try:
+        yield fake
+    finally:
+        set_presigner(None)
@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
 from nodo_documentos.db.repos.document import DocumentRepository
@@ -27,17 +29,24 @@ async def test_create_document_persists_entry(async_session):
 async def test_list_by_health_user_returns_descending(async_session):
     repo = DocumentRepository(async_session)
 
-    first = await repo.create(
-        created_by="worker-1",
-        health_user_ci="patient-1",
-        clinic_name="clinic-1",
-        s3_url="s3://bucket/doc-1",
-    )
-    second = await repo.create(
-        created_by="worker-1",
-        health_user_ci="patient-1",
-        clinic_name="clinic-1",
-        s3_url="s3://bucket/doc-2",
+    earlier = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    first, second = await repo.bulk_create(
+        [
+            {
+                "created_by": "worker-1",
+                "health_user_ci": "patient-1",
+                "clinic_name": "clinic-1",
+                "s3_url": "s3://bucket/doc-1",
+                "created_at": earlier,
+            },
+            {
+                "created_by": "worker-1",
+                "health_user_ci": "patient-1",
+                "clinic_name": "clinic-1",
+                "s3_url": "s3://bucket/doc-2",
+                "created_at": earlier + timedelta(minutes=1),
+            },
+        ]
     )
 
     docs = await repo.list_by_health_user("patient-1")
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import pickle
+from collections.abc import AsyncIterator, Callable, Iterator
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from nodo_documentos.db.models import Document
+from nodo_documentos.rag.vector_db.db import VectorDB, get_vector_db
+from nodo_documentos.services.models import ClinicalDocumentChunk
+from nodo_documentos.services.rag_service import RAGService, build_clinical_chunks
+
+SAMPLE_PDF = Path(__file__).parent.parent.parent / "sample.pdf"
+SAMPLE_CHUNKS = Path(__file__).parent.parent / "fixtures" / "sample_chunks.pkl"
+PREINDEXED_HEALTH_USER_CI = "87654321"
+# Fixed so a crashed run's points are replaced, never duplicated
+PREINDEXED_DOC_ID = "5a3b1e00-0000-4000-8000-000000000001"
+
+
+@pytest.fixture(scope="session")
+def vector_db() -> VectorDB:
+    """The process-wide vector DB handle; override to point tests elsewhere."""
+    return get_vector_db()
+
+
+def _sample_chunks_key() -> str:
+    """
+    Fingerprint of everything that shapes the cached chunks and vectors.
+
+    Covers sample.pdf's bytes, the OCR and embedding models and the chunker
+    sizes, so a config change rebuilds the cache instead of reusing stale data.
+    """
+    from nodo_documentos.rag.chunking.chunker import get_chunker
+    from nodo_documentos.rag.encoding.settings import settings as encoding_settings
+    from nodo_documentos.rag.parsing.settings import settings as parsing_settings
+
+    chunker = get_chunker()
+    inputs = {
+        "pdf_sha256": hashlib.sha256(SAMPLE_PDF.read_bytes()).hexdigest(),
+        "ocr_model": parsing_settings.ocr_model,
+        "embedding_model": encoding_settings.embedding_model,
+        "chunk_size": chunker.chunk_size,
+        "chunk_overlap": chunker.chunk_overlap,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def _build_sample_chunks(key: str) -> None:
+    """Run the real parse → chunk → embed pipeline once and persist the result."""
+    from nodo_documentos.rag.chunking.chunker import get_chunker
+    from nodo_documentos.rag.encoding.encoder import get_encoder
+    from nodo_documentos.rag.parsing.parser import get_parser
+
+    parsed_doc = get_parser().parse_pdf(SAMPLE_PDF)
+    base_chunks = get_chunker().chunk_document(parsed_doc)
+    embeddings = get_encoder().embed_many([chunk.text for chunk in base_chunks])
+
+    SAMPLE_CHUNKS.parent.mkdir(parents=True, exist_ok=True)
+    with open(SAMPLE_CHUNKS, "wb") as f:
+        pickle.dump((key, parsed_doc, base_chunks, embeddings), f)
+
+
+def _load_sample_chunks(key: str):
+    """Return the cached (parsed_doc, chunks, embeddings), or None if stale."""
+    if not SAMPLE_CHUNKS.exists():
+        return None
+
+    with open(SAMPLE_CHUNKS, "rb") as f:
+        cached = pickle.load(f)
+    # Caches written before keying are bare 3-tuples
+    if len(cached) != 4 or cached[0] != key:
+        return None
+    return cached[1:]
+
+
+@pytest.fixture(scope="session")
+def preindexed_doc(
+    vector_db: VectorDB,
+) -> Iterator[tuple[str, list[ClinicalDocumentChunk]]]:
+    """
+    sample.pdf stored in Qdrant under a fixed document id, without the pipeline.
+
+    Parsed chunks and their embeddings are cached in tests/fixtures (ignored
+    by git) and keyed on the inputs that produce them, so only the first run
+    after a change pays for OCR and the embedding calls. The document's points
+    are cleared before upserting and deleted again at teardown, so repeated
+    runs never leave duplicate vectors behind.
+    """
+    if not SAMPLE_PDF.exists():
+        pytest.skip(f"sample.pdf not found at {SAMPLE_PDF}")
+
+    key = _sample_chunks_key()
+    cached = _load_sample_chunks(key)
+    if cached is None:
+        _build_sample_chunks(key)
+        cached = _load_sample_chunks(key)
+    parsed_doc, base_chunks, embeddings = cached
+
+    doc_id = PREINDEXED_DOC_ID
+    document = Document(
+        doc_id=UUID(doc_id),
+        health_user_ci=PREINDEXED_HEALTH_USER_CI,
+        clinic_name="Test Clinic",
+        created_by="12345678",
+    )
+    chunks = build_clinical_chunks(base_chunks, document)
+
+    vector_db.delete_document(doc_id)
+    vector_db.index_document(parsed_doc, chunks, embeddings)
+
+    yield doc_id, chunks
+
+    vector_db.delete_document(doc_id)
+
+
+class _SignallingRAGService:
+    """
+    RAG service wrapper that signals the test loop when indexing finishes.
+
+    Background indexing runs on a worker thread with its own event loop, so
+    completion is handed back to the test loop with call_soon_threadsafe.
+    """
+
+    def __init__(
+        self,
+        service: RAGService,
+        loop: asyncio.AbstractEventLoop,
+        done: dict[str, asyncio.Event],
+    ) -> None:
+        self._service = service
+        self._loop = loop
+        self._done = done
+
+    async def index_document(self, document: Document) -> None:
+        try:
+            await self._service.index_document(document)
+        finally:
+            self._loop.call_soon_threadsafe(self._mark_done, str(document.doc_id))
+
+    def _mark_done(self, doc_id: str) -> None:
+        self._done.setdefault(doc_id, asyncio.Event()).set()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def index_done(
+    test_app: FastAPI, override_rag: Callable[[object], None]
+) -> AsyncIterator[dict[str, asyncio.Event]]:
+    """
+    Per-document indexing completion events, also exposed on test_app.state.
+
+    Await ``index_done.setdefault(doc_id, asyncio.Event()).wait()`` instead of
+    polling Qdrant; the event is set whether indexing succeeded or failed.
+    """
+    from nodo_documentos.services.factory import get_rag_service
+
+    done: dict[str, asyncio.Event] = {}
+    service = _SignallingRAGService(get_rag_service(), asyncio.get_running_loop(), done)
+    override_rag(service)
+    test_app.state.index_done = done
+
+    yield done
+
+    del test_app.state.index_done
@@ -10,21 +10,30 @@ This test verifies:
 
 import asyncio
 import os
+import time
 from pathlib import Path
 
 import pytest
 
 from nodo_documentos.rag.inference.settings import settings as cerebras_settings
-from nodo_documentos.rag.vector_db.db import get_vector_db
+
+# Integration tests share external services, so xdist keeps them on one worker
+# when run with --dist=loadgroup.
+pytestmark = pytest.mark.xdist_group("integration")
 
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_complete_chat_flow_with_rag(async_client, test_app):
+@pytest.mark.slow
+async def test_complete_chat_flow_with_rag(
+    async_client, test_app, http_client, index_done, vector_db
+):
     """
     End-to-end integration test: Create document → Index → Chat.
 
-    Uses real sample.pdf and verifies the complete RAG pipeline.
+    Uses real sample.pdf and verifies the complete RAG pipeline. The upload,
+    OCR and embedding steps are slow, so this only runs with ``--slow``;
+    the chat behavior is covered on every run by the preindexed test below.
     """
     # Skip if Cerebras API key is not configured
     if not cerebras_settings.api_key:
@@ -68,15 +77,12 @@ async def test_complete_chat_flow_with_rag(async_client, test_app):
 
     # Step 2: Upload PDF to S3
     print("📤 Step 2: Uploading PDF to S3...")
-    import httpx
-
-    async with httpx.AsyncClient() as http_client:
-        upload_http_response = await http_client.put(
-            upload_url,
-            content=pdf_content,
-            headers={"Content-Type": "application/pdf"},
-        )
-        assert upload_http_response.status_code in [200, 201]
+    upload_http_response = await http_client.put(
+        upload_url,
+        content=pdf_content,
+        headers={"Content-Type": "application/pdf"},
+    )
+    assert upload_http_response.status_code in [200, 201]
     print("✅ PDF uploaded to S3\n")
 
     # Step 3: Create document record (triggers background RAG indexing)
@@ -98,37 +104,65 @@ async def test_complete_chat_flow_with_rag(async_client, test_app):
     print("⏳ Step 4: Waiting for RAG indexing to complete...")
     print("   (S3 download → PDF parse → chunk → embed → store in Qdrant)\n")
 
-    vector_db = get_vector_db()
     max_wait = 120  # Wait up to 2 minutes for real PDF processing
-    waited = 0
-    chunks_found = False
+    started = time.perf_counter()
+    await asyncio.wait_for(
+        index_done.setdefault(doc_id, asyncio.Event()).wait(), timeout=max_wait
+    )
 
-    while waited < max_wait:
-        await asyncio.sleep(5)
-        waited += 5
+    chunk_count = vector_db.count_chunks(doc_id)
+    assert chunk_count > 0, "Indexing finished without storing chunks"
+    print(
+        f"✅ Found {chunk_count} chunks after "
+        f"{time.perf_counter() - started:.1f} seconds!\n"
+    )
 
-        chunks = vector_db.get_chunks_for_document(str(doc_id), limit=1)
-        if chunks:
-            chunks_found = True
-            all_chunks = vector_db.get_chunks_for_document(str(doc_id), limit=1000)
-            print(f"✅ Found {len(all_chunks)} chunks after {waited} seconds!\n")
-            break
+    await _run_chat_queries(async_client, str(doc_id))
 
-        print(f"   ... still waiting ({waited}s) ...")
+    print("🎉 Integration test completed successfully!")
+    print(f"   Document: {doc_id}")
+    print(f"   Total chunks indexed: {chunk_count}")
+    print(f"   Chat queries tested: 3")
 
-    assert chunks_found, (
-        f"No chunks found after {max_wait} seconds - indexing may have failed"
-    )
 
-    # Step 5: Test chat query
-    print("💬 Step 5: Testing chat query...")
+@pytest.mark.asyncio
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not cerebras_settings.api_key,
+    reason="CEREBRAS_API_KEY not set - skipping chat integration test.",
+)
+async def test_chat_flow_with_preindexed_document(
+    async_client, test_app, preindexed_doc
+):
+    """Chat against sample.pdf chunks upserted straight into Qdrant."""
+    doc_id, chunks = preindexed_doc
+    print(f"\n📄 Using preindexed document {doc_id} ({len(chunks)} chunks)\n")
+
+    await _run_chat_queries(async_client, doc_id)
+
+
+async def _run_chat_queries(async_client, doc_id: str) -> None:
+    """Steps 5-7: plain, follow-up and document-filtered chat queries."""
+    # Steps 5 and 7 are independent chat queries, so issue them concurrently;
+    # Step 6 needs Step 5's answer and runs afterwards.
+    print("💬 Steps 5 & 7: Testing chat query and document_id filter...")
     chat_payload = {
         "query": "What is this document about?",
         "conversation_history": [],
         "health_user_ci": "87654321",
     }
+    filtered_payload = {
+        "query": "Summarize the key points",
+        "health_user_ci": "87654321",
+        "document_id": doc_id,
+    }
+
+    chat_response, filtered_response = await asyncio.gather(
+        async_client.post("/api/chat", json=chat_payload),
+        async_client.post("/api/chat", json=filtered_payload),
+    )
 
-    chat_response = await async_client.post("/api/chat", json=chat_payload)
+    # Step 5: Verify chat query
     if chat_response.status_code != 200:
         print(f"❌ Chat request failed with status {chat_response.status_code}")
         print(f"   Response: {chat_response.text}")
@@ -151,7 +185,7 @@ async def test_complete_chat_flow_with_rag(async_client, test_app):
 
     # Verify sources have correct metadata
     for source in chat_data["sources"][:3]:  # Check first 3 sources
-        assert source["document_id"] == str(doc_id)
+        assert source["document_id"] == doc_id
         assert "chunk_id" in source
         assert "text" in source
         assert "similarity_score" in source
@@ -179,15 +213,7 @@ async def test_complete_chat_flow_with_rag(async_client, test_app):
         f"✅ Follow-up response received: {len(follow_up_data['answer'])} characters\n"
     )
 
-    # Step 7: Test chat with specific document filter
-    print("💬 Step 7: Testing chat with document_id filter...")
-    filtered_payload = {
-        "query": "Summarize the key points",
-        "health_user_ci": "87654321",
-        "document_id": str(doc_id),
-    }
-
-    filtered_response = await async_client.post("/api/chat", json=filtered_payload)
+    # Step 7: Verify chat with specific document filter
     assert filtered_response.status_code == 200
     filtered_data = filtered_response.json()
 
@@ -196,15 +222,8 @@ async def test_complete_chat_flow_with_rag(async_client, test_app):
 
     # Verify all sources are from the specified document
     for source in filtered_data["sources"]:
-        assert source["document_id"] == str(doc_id)
+        assert source["document_id"] == doc_id
 
     print(
         f"✅ Filtered query returned {len(filtered_data['sources'])} sources from document {doc_id}\n"
     )
-
-    print("🎉 Integration test completed successfully!")
-    print(f"   Document: {doc_id}")
-    print(
-        f"   Total chunks indexed: {len(vector_db.get_chunks_for_document(str(doc_id), limit=1000))}"
-    )
-    print(f"   Chat queries tested: 3")
@@ -17,23 +17,58 @@ The test will:
 
 import asyncio
 import os
+from collections.abc import AsyncIterator
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import httpx
 import pytest
 
-from nodo_documentos.rag.inference.settings import settings as cerebras_settings
-from nodo_documentos.rag.vector_db.db import get_vector_db
+# Integration tests share external services, so xdist keeps them on one worker
+# when run with --dist=loadgroup.
+pytestmark = pytest.mark.xdist_group("integration")
 
 
 # Base URL for the running server
 BASE_URL = os.getenv("TEST_SERVER_URL", "http://localhost:8000")
 API_BASE = f"{BASE_URL}/api"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Identities shared by every request in the flow
+CLINIC_NAME = "Test Clinic"
+HEALTH_USER_CI = "87654321"
+HEALTH_WORKER_CI = "12345678"
+BASE_CHAT_PAYLOAD = {"health_user_ci": HEALTH_USER_CI}
+SERVER_PROBE_TIMEOUT = 0.25
+
+
+async def _server_reachable(url: str) -> bool:
+    """Return whether a TCP connection to the server behind ``url`` opens."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port),
+            timeout=SERVER_PROBE_TIMEOUT,
+        )
+    except (asyncio.TimeoutError, OSError):
+        return False
+
+    writer.close()
+    await writer.wait_closed()
+    return True
+
+
+async def _iter_file(path: Path) -> AsyncIterator[bytes]:
+    """Yield a file in chunks, reading off the event loop."""
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
 
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_server_chat_flow():
+async def test_server_chat_flow(http_client, vector_db):
     """
     End-to-end integration test against running server.
 
@@ -44,6 +79,8 @@ async def test_server_chat_flow():
         - CEREBRAS_API_KEY environment variable must be set
         - sample.pdf must exist in project root
     """
+    from nodo_documentos.rag.inference.settings import settings as cerebras_settings
+
     # Skip if Cerebras API key is not configured
     if not cerebras_settings.api_key:
         pytest.skip(
@@ -63,216 +100,209 @@ async def test_server_chat_flow():
     print(f"📄 Using PDF: {sample_pdf_path.name} ({pdf_size_kb:.2f} KB)")
     print(f"🌐 Server URL: {BASE_URL}\n")
 
-    # Read PDF content
-    with open(sample_pdf_path, "rb") as f:
-        pdf_content = f.read()
-
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        # Check if server is running
-        try:
-            health_check = await client.get(f"{BASE_URL}/docs", timeout=5.0)
-            if health_check.status_code not in [200, 404]:  # 404 is OK for /docs
-                pytest.skip(
-                    f"Server appears to be down or unreachable at {BASE_URL}. "
-                    f"Status: {health_check.status_code}"
-                )
-        except httpx.ConnectError:
-            pytest.skip(
-                f"Cannot connect to server at {BASE_URL}. "
-                "Make sure the server is running: "
-                "uv run uvicorn nodo_documentos.app:app --host 0.0.0.0 --port 8000"
-            )
-        # Step 1: Get presigned upload URL
-        print("📤 Step 1: Getting presigned upload URL...")
-        clinic_name = "Test Clinic"
-        upload_response = await client.post(
-            f"{API_BASE}/documents/upload-url",
-            json={
-                "file_name": "sample.pdf",
-                "content_type": "application/pdf",
-                "clinic_name": clinic_name,
-            },
-        )
-        assert upload_response.status_code == 201, (
-            f"Failed to get upload URL: {upload_response.status_code} - {upload_response.text}"
-        )
-        upload_data = upload_response.json()
-        upload_url = upload_data["upload_url"]
-        s3_url = upload_data["s3_url"]
-        print(f"✅ Got upload URL: {upload_data['object_key']}\n")
-
-        # Step 2: Upload PDF to S3
-        print("📤 Step 2: Uploading PDF to S3...")
-        upload_http_response = await client.put(
-            upload_url,
-            content=pdf_content,
-            headers={"Content-Type": "application/pdf"},
-        )
-        assert upload_http_response.status_code in [200, 201], (
-            f"Failed to upload PDF: {upload_http_response.status_code}"
-        )
-        print("✅ PDF uploaded to S3\n")
-
-        # Step 3: Create document record (triggers background RAG indexing)
-        print("📝 Step 3: Creating document record (triggers RAG indexing)...")
-        doc_payload = {
-            "created_by": "12345678",
-            "health_user_ci": "87654321",
-            "clinic_name": clinic_name,
-            "s3_url": s3_url,
-        }
-
-        doc_response = await client.post(
-            f"{API_BASE}/documents",
-            json=doc_payload,
-        )
-        assert doc_response.status_code == 201, (
-            f"Failed to create document: {doc_response.status_code} - {doc_response.text}"
-        )
-        doc_data = doc_response.json()
-        doc_id = doc_data["doc_id"]
-        print(f"✅ Document created: {doc_id}\n")
-
-        # Step 4: Wait for RAG indexing to complete
-        print("⏳ Step 4: Waiting for RAG indexing to complete...")
-        print("   (S3 download → PDF parse → chunk → embed → store in Qdrant)\n")
-
-        vector_db = get_vector_db()
-        max_wait = 120  # Wait up to 2 minutes for real PDF processing
-        waited = 0
-        chunks_found = False
-
-        while waited < max_wait:
-            await asyncio.sleep(5)
-            waited += 5
-
-            chunks = vector_db.get_chunks_for_document(str(doc_id), limit=1)
-            if chunks:
-                chunks_found = True
-                all_chunks = vector_db.get_chunks_for_document(str(doc_id), limit=1000)
-                print(f"✅ Found {len(all_chunks)} chunks after {waited} seconds!\n")
-                break
-
-            print(f"   ... still waiting ({waited}s) ...")
-
-        assert chunks_found, (
-            f"No chunks found after {max_wait} seconds - indexing may have failed"
-        )
-
-        # Step 5: Test chat query (filter by document_id to avoid old chunks)
-        print("💬 Step 5: Testing chat query...")
-        chat_payload = {
-            "query": "What is this document about?",
-            "conversation_history": [],
-            "health_user_ci": "87654321",
-            "document_id": str(doc_id),  # Filter by the document we just created
-        }
-
-        chat_response = await client.post(
-            f"{API_BASE}/chat",
-            json=chat_payload,
-        )
-        if chat_response.status_code != 200:
-            print(f"❌ Chat request failed with status {chat_response.status_code}")
-            print(f"   Response: {chat_response.text}")
-            print(f"\n   Note: This may indicate:")
-            print(f"   - Invalid or missing CEREBRAS_API_KEY")
-            print(f"   - Network connectivity issues")
-            print(f"   - Cerebras API service issues")
-            pytest.fail(f"Chat API call failed: {chat_response.text}")
-
-        chat_data = chat_response.json()
-        print(f"✅ Chat response received!\n")
-        print(f"   Answer: {chat_data['answer'][:200]}...")
-        print(f"   Sources: {len(chat_data['sources'])} chunks\n")
-
-        # Verify response structure
-        assert "answer" in chat_data
-        assert "sources" in chat_data
-        assert len(chat_data["answer"]) > 0
-        assert len(chat_data["sources"]) > 0
-
-        # Verify sources have correct metadata
-        for source in chat_data["sources"][:3]:  # Check first 3 sources
-            assert source["document_id"] == str(doc_id)
-            assert "chunk_id" in source
-            assert "text" in source
-            assert "similarity_score" in source
-            assert source["similarity_score"] > 0
-
-        print("✅ Source metadata verified\n")
-
-        # Step 6: Test chat with conversation history
-        print("💬 Step 6: Testing chat with conversation history...")
-        follow_up_payload = {
-            "query": "Can you tell me more details?",
-            "conversation_history": [
-                {"role": "user", "content": "What is this document about?"},
-                {"role": "assistant", "content": chat_data["answer"]},
-            ],
-            "health_user_ci": "87654321",
-        }
-
-        follow_up_response = await client.post(
-            f"{API_BASE}/chat",
-            json=follow_up_payload,
-        )
-        assert follow_up_response.status_code == 200
-        follow_up_data = follow_up_response.json()
-
-        assert len(follow_up_data["answer"]) > 0
-        print(
-            f"✅ Follow-up response received: {len(follow_up_data['answer'])} characters\n"
-        )
-
-        # Step 7: Test chat with specific document filter
-        print("💬 Step 7: Testing chat with document_id filter...")
-        filtered_payload = {
-            "query": "Summarize the key points",
-            "health_user_ci": "87654321",
-            "document_id": str(doc_id),
-        }
-
-        filtered_response = await client.post(
-            f"{API_BASE}/chat",
-            json=filtered_payload,
-        )
-        assert filtered_response.status_code == 200
-        filtered_data = filtered_response.json()
-
-        assert len(filtered_data["answer"]) > 0
-        assert len(filtered_data["sources"]) > 0
-
-        # Verify all sources are from the specified document
-        for source in filtered_data["sources"]:
-            assert source["document_id"] == str(doc_id)
-
-        print(
-            f"✅ Filtered query returned {len(filtered_data['sources'])} sources from document {doc_id}\n"
+    # Check if server is running
+    if not await _server_reachable(BASE_URL):
+        pytest.skip(
+            f"Cannot connect to server at {BASE_URL}. "
+            "Make sure the server is running: "
+            "uv run uvicorn nodo_documentos.app:app --host 0.0.0.0 --port 8000"
         )
 
-        # Step 8: Test clinical history endpoint
-        print("📋 Step 8: Testing clinical history endpoint...")
-        history_response = await client.get(
-            f"{API_BASE}/clinical-history/87654321",
+    # Step 1: Get presigned upload URL
+    print("📤 Step 1: Getting presigned upload URL...")
+    upload_response = await http_client.post(
+        f"{API_BASE}/documents/upload-url",
+        json={
+            "file_name": "sample.pdf",
+            "content_type": "application/pdf",
+            "clinic_name": CLINIC_NAME,
+        },
+    )
+    assert upload_response.status_code == 201, (
+        f"Failed to get upload URL: {upload_response.status_code} - {upload_response.text}"
+    )
+    upload_data = upload_response.json()
+    upload_url = upload_data["upload_url"]
+    s3_url = upload_data["s3_url"]
+    print(f"✅ Got upload URL: {upload_data['object_key']}\n")
+
+    # Step 2: Upload PDF to S3
+    print("📤 Step 2: Uploading PDF to S3...")
+    # Stream the file; presigned S3 PUTs reject chunked bodies, so send an
+    # explicit Content-Length
+    upload_http_response = await http_client.put(
+        upload_url,
+        content=_iter_file(sample_pdf_path),
+        headers={
+            "Content-Type": "application/pdf",
+            "Content-Length": str(sample_pdf_path.stat().st_size),
+        },
+    )
+    assert upload_http_response.status_code in [200, 201], (
+        f"Failed to upload PDF: {upload_http_response.status_code}"
+    )
+    print("✅ PDF uploaded to S3\n")
+
+    # Step 3: Create document record (triggers background RAG indexing)
+    print("📝 Step 3: Creating document record (triggers RAG indexing)...")
+    doc_payload = {
+        "created_by": HEALTH_WORKER_CI,
+        "health_user_ci": HEALTH_USER_CI,
+        "clinic_name": CLINIC_NAME,
+        "s3_url": s3_url,
+    }
+
+    doc_response = await http_client.post(
+        f"{API_BASE}/documents",
+        json=doc_payload,
+    )
+    assert doc_response.status_code == 201, (
+        f"Failed to create document: {doc_response.status_code} - {doc_response.text}"
+    )
+    doc_data = doc_response.json()
+    doc_id: str = doc_data["doc_id"]  # Already a string in the JSON body
+    print(f"✅ Document created: {doc_id}\n")
+
+    # Step 4: Wait for RAG indexing to complete
+    print("⏳ Step 4: Waiting for RAG indexing to complete...")
+    print("   (S3 download → PDF parse → chunk → embed → store in Qdrant)\n")
+
+    max_wait = 120  # Absolute deadline for real PDF processing
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + max_wait
+    delay = 0.25  # Back off exponentially up to 2s between polls
+
+    # Probe once before sleeping; fast indexing may already be done
+    chunk_count = vector_db.count_chunks(doc_id)
+    while chunk_count == 0 and loop.time() < deadline:
+        await asyncio.sleep(min(delay, deadline - loop.time()))
+        delay = min(delay * 1.5, 2.0)
+        chunk_count = vector_db.count_chunks(doc_id)
+        if chunk_count == 0:
+            print(f"   ... still waiting ({loop.time() - started:.1f}s) ...")
+
+    assert chunk_count > 0, (
+        f"No chunks found after {max_wait} seconds - indexing may have failed"
+    )
+    print(f"✅ Found {chunk_count} chunks after {loop.time() - started:.1f} seconds!\n")
+
+    # Steps 5, 7 and 8 only need the indexed document, so they run
+    # concurrently; Step 6 consumes Step 5's answer and runs afterwards.
+    print("💬 Steps 5, 7 & 8: Chat query, document filter and clinical history...")
+    chat_payload = BASE_CHAT_PAYLOAD | {
+        "query": "What is this document about?",
+        "conversation_history": [],
+        "document_id": doc_id,  # Filter by the document we just created
+    }
+    filtered_payload = BASE_CHAT_PAYLOAD | {
+        "query": "Summarize the key points",
+        "document_id": doc_id,
+    }
+
+    chat_response, filtered_response, history_response = await asyncio.gather(
+        http_client.post(f"{API_BASE}/chat", json=chat_payload),
+        http_client.post(f"{API_BASE}/chat", json=filtered_payload),
+        http_client.get(
+            f"{API_BASE}/clinical-history/{HEALTH_USER_CI}",
             params={
-                "health_worker_ci": "12345678",
-                "clinic_name": clinic_name,
+                "health_worker_ci": HEALTH_WORKER_CI,
+                "clinic_name": CLINIC_NAME,
             },
-        )
-        assert history_response.status_code == 200
-        history_data = history_response.json()
-
-        # Verify document is in the list
-        doc_ids = [doc["doc_id"] for doc in history_data]
-        assert str(doc_id) in doc_ids, f"Document {doc_id} not found in clinical history"
-        print(f"✅ Clinical history returned {len(history_data)} documents\n")
-
-        print("🎉 Server integration test completed successfully!")
-        print(f"   Document: {doc_id}")
-        print(
-            f"   Total chunks indexed: {len(vector_db.get_chunks_for_document(str(doc_id), limit=1000))}"
-        )
-        print(f"   Chat queries tested: 3")
-        print(f"   API endpoints tested: 4")
-
+        ),
+    )
+
+    chat_data = _check_chat_response(chat_response, doc_id)
+    _check_filtered_response(filtered_response, doc_id)
+    _check_history_response(history_response, doc_id)
+
+    # Step 6: Test chat with conversation history
+    print("💬 Step 6: Testing chat with conversation history...")
+    follow_up_payload = BASE_CHAT_PAYLOAD | {
+        "query": "Can you tell me more details?",
+        "conversation_history": [
+            {"role": "user", "content": "What is this document about?"},
+            {"role": "assistant", "content": chat_data["answer"]},
+        ],
+    }
+
+    follow_up_response = await http_client.post(
+        f"{API_BASE}/chat",
+        json=follow_up_payload,
+    )
+    assert follow_up_response.status_code == 200
+    follow_up_data = follow_up_response.json()
+
+    assert len(follow_up_data["answer"]) > 0
+    print(
+        f"✅ Follow-up response received: {len(follow_up_data['answer'])} characters\n"
+    )
+
+    print("🎉 Server integration test completed successfully!")
+    print(f"   Document: {doc_id}")
+    print(f"   Total chunks indexed: {chunk_count}")
+    print(f"   Chat queries tested: 3")
+    print(f"   API endpoints tested: 4")
+
+
+def _check_chat_response(response: httpx.Response, doc_id: str) -> dict:
+    """Step 5: plain chat query answered from the new document."""
+    if response.status_code != 200:
+        print(f"❌ Chat request failed with status {response.status_code}")
+        print(f"   Response: {response.text}")
+        print(f"\n   Note: This may indicate:")
+        print(f"   - Invalid or missing CEREBRAS_API_KEY")
+        print(f"   - Network connectivity issues")
+        print(f"   - Cerebras API service issues")
+        pytest.fail(f"Chat API call failed: {response.text}")
+
+    chat_data = response.json()
+    print(f"✅ Chat response received!\n")
+    print(f"   Answer: {chat_data['answer'][:200]}...")
+    print(f"   Sources: {len(chat_data['sources'])} chunks\n")
+
+    # Verify response structure
+    assert "answer" in chat_data
+    assert "sources" in chat_data
+    assert len(chat_data["answer"]) > 0
+    assert len(chat_data["sources"]) > 0
+
+    # Verify sources have correct metadata
+    for source in chat_data["sources"][:3]:  # Check first 3 sources
+        assert source["document_id"] == doc_id
+        assert "chunk_id" in source
+        assert "text" in source
+        assert "similarity_score" in source
+        assert source["similarity_score"] > 0
+
+    print("✅ Source metadata verified\n")
+    return chat_data
+
+
+def _check_filtered_response(response: httpx.Response, doc_id: str) -> None:
+    """Step 7: chat restricted to one document only cites that document."""
+    assert response.status_code == 200
+    filtered_data = response.json()
+
+    assert len(filtered_data["answer"]) > 0
+    assert len(filtered_data["sources"]) > 0
+
+    # Verify all sources are from the specified document
+    for source in filtered_data["sources"]:
+        assert source["document_id"] == doc_id
+
+    print(
+        f"✅ Filtered query returned {len(filtered_data['sources'])} sources from document {doc_id}\n"
+    )
+
+
+def _check_history_response(response: httpx.Response, doc_id: str) -> None:
+    """Step 8: the new document shows up in the patient's clinical history."""
+    assert response.status_code == 200
+    history_data = response.json()
+
+    # Verify document is in the list
+    assert any(doc["doc_id"] == doc_id for doc in history_data), (
+        f"Document {doc_id} not found in clinical history"
+    )
+    print(f"✅ Clinical history returned {len(history_data)} documents\n")
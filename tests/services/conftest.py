@@ -0,0 +1,196 @@
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any, NamedTuple
+from unittest.mock import MagicMock, create_autospec
+
+import numpy as np
+import pytest
+
+from nodo_documentos.rag.chunking.chunker import PDFChunker
+from nodo_documentos.rag.chunking.models import Chunk
+from nodo_documentos.rag.encoding.encoder import EmbeddingEncoder
+from nodo_documentos.rag.inference.service import CerebrasInferenceService
+from nodo_documentos.rag.parsing.models import DocumentMetadata, ParsedDocument
+from nodo_documentos.rag.parsing.parser import PDFParser
+from nodo_documentos.rag.vector_db.db import VectorDB
+from nodo_documentos.services.rag_service import RAGService
+
+ChatMocks = tuple[MagicMock, MagicMock, MagicMock]
+
+# One shared 1536-dim vector; mocks only read it
+_MOCK_EMBED = np.full(1536, 0.1, dtype=np.float32).tolist()
+
+# Fake PDF payloads: an opaque blob for mocked parsers, and a minimal
+# well-formed document for the real one
+_FAKE_PDF_MIN = b"%PDF-1.4 fake pdf content"
+_FAKE_PDF_STRUCTURAL = b"".join(
+    (
+        b"%PDF-1.4\n",
+        b"1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\n",
+        b"xref\n0 0\n",
+        b"trailer\n<<\n/Root 1 0 R\n>>\n",
+        b"%%EOF",
+    )
+)
+
+
+@pytest.fixture(scope="module")
+def _chat_mocks() -> ChatMocks:
+    # Building spec'd mocks walks the spec class, so do it once per module
+    return (
+        MagicMock(spec=VectorDB),
+        MagicMock(spec=EmbeddingEncoder),
+        MagicMock(spec=CerebrasInferenceService),
+    )
+
+
+@pytest.fixture
+def chat_mocks(_chat_mocks: ChatMocks) -> Iterator[ChatMocks]:
+    """Vector DB, encoder and inference mocks, reset after every test."""
+
+    yield _chat_mocks
+
+    for mock in _chat_mocks:
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+# Built once; tests derive variants with shallow model_copy updates and must
+# not mutate the shared instances
+_BASE_PARSED = ParsedDocument(
+    id="test-doc-id",
+    document_name="test_document",
+    file_path=Path("/tmp/test.pdf"),
+    text="Test document content",
+    sections=[],
+    page_info=[],
+    metadata=DocumentMetadata(pages_processed=1, ocr_model="test-model"),
+)
+_BASE_CHUNK = Chunk(
+    chunk_id=0,
+    document_id="test-doc-id",
+    document_name="test_document",
+    text="Test chunk",
+    section_title=None,
+    page_number=1,
+    token_count=2,
+)
+
+
+def _make_parsed(**overrides: Any) -> ParsedDocument:
+    return _BASE_PARSED.model_copy(update=overrides)
+
+
+def _make_chunk(**overrides: Any) -> Chunk:
+    return _BASE_CHUNK.model_copy(update=overrides)
+
+
+@pytest.fixture(scope="session")
+def make_parsed() -> Callable[..., ParsedDocument]:
+    """Factory for test ParsedDocuments; keyword arguments override fields."""
+
+    return _make_parsed
+
+
+@pytest.fixture(scope="session")
+def make_chunk() -> Callable[..., Chunk]:
+    """Factory for test Chunks; keyword arguments override fields."""
+
+    return _make_chunk
+
+
+@pytest.fixture(scope="session")
+def s3_objects() -> dict[str, bytes]:
+    """
+    Fake S3 contents keyed by URL, shared across the session.
+
+    Patch ``download_from_s3`` with ``s3_objects.__getitem__``; tests must not
+    mutate the dict.
+    """
+
+    return {
+        "s3://bucket/test-doc.pdf": _FAKE_PDF_MIN,
+        "s3://bucket/test.pdf": _FAKE_PDF_MIN,
+        "s3://bucket/test-integration.pdf": _FAKE_PDF_STRUCTURAL,
+    }
+
+
+class RAGMocks(NamedTuple):
+    vector_db: MagicMock
+    parser: MagicMock
+    chunker: MagicMock
+    encoder: MagicMock
+    parsed_doc: ParsedDocument
+    chunks: list[Chunk]
+    embedding: list[float]
+
+    def service(self, **kwargs: Any) -> RAGService:
+        """Build a RAGService wired to these mocks."""
+        return RAGService(
+            vector_db=self.vector_db,
+            pdf_parser=self.parser,
+            pdf_chunker=self.chunker,
+            encoder=self.encoder,
+            **kwargs,
+        )
+
+
+@pytest.fixture
+def rag_mocks() -> RAGMocks:
+    """
+    Autospecced RAG pipeline mocks preloaded with a one-chunk parsed document.
+
+    Tests that need different chunks or embeddings override the return
+    values on ``chunker.chunk_document`` and ``encoder.embed_many``, reusing
+    ``embedding`` for each vector.
+    """
+
+    parsed_doc = _make_parsed()
+    chunks = [_make_chunk()]
+
+    # Autospec mirrors each method's signature and sync/async-ness, so a
+    # pipeline step turning async (or changing arguments) fails these tests
+    parser = create_autospec(PDFParser, instance=True)
+    parser.parse_pdf.return_value = parsed_doc
+    chunker = create_autospec(PDFChunker, instance=True)
+    chunker.chunk_document.return_value = chunks
+    encoder = create_autospec(EmbeddingEncoder, instance=True)
+    encoder.embed_many.return_value = [_MOCK_EMBED]
+
+    return RAGMocks(
+        vector_db=create_autospec(VectorDB, instance=True),
+        parser=parser,
+        chunker=chunker,
+        encoder=encoder,
+        parsed_doc=parsed_doc,
+        chunks=chunks,
+        embedding=_MOCK_EMBED,
+    )
+
+
+class RAGComponents(NamedTuple):
+    vector_db: VectorDB
+    parser: PDFParser
+    chunker: PDFChunker
+    encoder: EmbeddingEncoder
+
+
+@pytest.fixture(scope="session")
+def rag_components() -> RAGComponents:
+    """Real RAG pipeline components, built once per session."""
+
+    # Skip before building anything so unrelated runs never open clients
+    if not os.getenv("qdrant_host"):
+        pytest.skip("Qdrant not configured - skipping integration test")
+
+    from nodo_documentos.rag.chunking.chunker import get_chunker
+    from nodo_documentos.rag.encoding.encoder import get_encoder
+    from nodo_documentos.rag.parsing.parser import get_parser
+    from nodo_documentos.rag.vector_db.db import get_vector_db
+
+    return RAGComponents(
+        vector_db=get_vector_db(),
+        parser=get_parser(),
+        chunker=get_chunker(),
+        encoder=get_encoder(),
+    )
@@ -1,24 +1,23 @@
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
 from nodo_documentos.api.schemas import ChatRequest, Message
-from nodo_documentos.rag.encoding.encoder import EmbeddingEncoder
-from nodo_documentos.rag.inference.service import CerebrasInferenceService
-from nodo_documentos.rag.vector_db.db import VectorDB
 from nodo_documentos.services.chat_service import ChatService
 
+# Same dtype EmbeddingEncoder.embed returns; shared so mock calls compare by identity
+QUERY_EMBEDDING = np.full(1536, 0.1, dtype=np.float32)
+
 
 @pytest.mark.asyncio
-async def test_chat_with_chunks_found():
+async def test_chat_with_chunks_found(chat_mocks):
     """Test chat service with successful chunk retrieval."""
     # Setup mocks
-    mock_vector_db = MagicMock(spec=VectorDB)
-    mock_encoder = MagicMock(spec=EmbeddingEncoder)
-    mock_inference = MagicMock(spec=CerebrasInferenceService)
+    mock_vector_db, mock_encoder, mock_inference = chat_mocks
 
     # Mock query embedding
-    mock_encoder.embed.return_value = [0.1] * 1536
+    mock_encoder.embed.return_value = QUERY_EMBEDDING
 
     # Mock vector search results - use MagicMock for ScoredPoint
     mock_chunk1 = MagicMock()
@@ -44,7 +43,9 @@ async def test_chat_with_chunks_found():
     mock_vector_db.search.return_value = [mock_chunk1, mock_chunk2]
 
     # Mock LLM response
-    mock_inference.generate.return_value = "The patient has diabetes and is taking Metformin."
+    mock_inference.generate.return_value = (
+        "The patient has diabetes and is taking Metformin."
+    )
 
     # Create service
     service = ChatService(mock_vector_db, mock_encoder, mock_inference)
@@ -70,7 +71,7 @@ async def test_chat_with_chunks_found():
     # Verify calls
     mock_encoder.embed.assert_called_once_with(request.query)
     mock_vector_db.search.assert_called_once_with(
-        embedding=[0.1] * 1536,
+        embedding=QUERY_EMBEDDING,
         limit=10,
         health_user_ci="87654321",
         document_id=None,
@@ -79,13 +80,11 @@ async def test_chat_with_chunks_found():
 
 
 @pytest.mark.asyncio
-async def test_chat_with_document_id_filter():
+async def test_chat_with_document_id_filter(chat_mocks):
     """Test chat service with specific document_id filter."""
-    mock_vector_db = MagicMock(spec=VectorDB)
-    mock_encoder = MagicMock(spec=EmbeddingEncoder)
-    mock_inference = MagicMock(spec=CerebrasInferenceService)
+    mock_vector_db, mock_encoder, mock_inference = chat_mocks
 
-    mock_encoder.embed.return_value = [0.1] * 1536
+    mock_encoder.embed.return_value = QUERY_EMBEDDING
 
     mock_chunk = MagicMock()
     mock_chunk.score = 0.9
@@ -109,7 +108,7 @@ async def test_chat_with_document_id_filter():
 
     assert response.answer == "Answer"
     mock_vector_db.search.assert_called_once_with(
-        embedding=[0.1] * 1536,
+        embedding=QUERY_EMBEDDING,
         limit=10,
         health_user_ci="87654321",
         document_id="11111111-2222-3333-4444-555555555555",
@@ -117,13 +116,11 @@ async def test_chat_with_document_id_filter():
 
 
 @pytest.mark.asyncio
-async def test_chat_no_chunks_found():
+async def test_chat_no_chunks_found(chat_mocks):
     """Test chat service when no chunks are found."""
-    mock_vector_db = MagicMock(spec=VectorDB)
-    mock_encoder = MagicMock(spec=EmbeddingEncoder)
-    mock_inference = MagicMock(spec=CerebrasInferenceService)
+    mock_vector_db, mock_encoder, mock_inference = chat_mocks
 
-    mock_encoder.embed.return_value = [0.1] * 1536
+    mock_encoder.embed.return_value = QUERY_EMBEDDING
     mock_vector_db.search.return_value = []
 
     service = ChatService(mock_vector_db, mock_encoder, mock_inference)
@@ -141,13 +138,11 @@ async def test_chat_no_chunks_found():
 
 
 @pytest.mark.asyncio
-async def test_chat_with_conversation_history():
+async def test_chat_with_conversation_history(chat_mocks):
     """Test chat service includes conversation history in messages."""
-    mock_vector_db = MagicMock(spec=VectorDB)
-    mock_encoder = MagicMock(spec=EmbeddingEncoder)
-    mock_inference = MagicMock(spec=CerebrasInferenceService)
+    mock_vector_db, mock_encoder, mock_inference = chat_mocks
 
-    mock_encoder.embed.return_value = [0.1] * 1536
+    mock_encoder.embed.return_value = QUERY_EMBEDDING
 
     mock_chunk = MagicMock()
     mock_chunk.score = 0.9
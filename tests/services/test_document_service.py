@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
 from nodo_documentos.db.repos.document import DocumentRepository
@@ -29,17 +31,24 @@ async def test_list_documents_orders_desc(async_session):
     repo = DocumentRepository(async_session)
     service = DocumentService(repo)
 
-    first = await service.create_document(
-        created_by="worker-1",
-        health_user_ci="patient-2",
-        clinic_name="clinic-1",
-        s3_url="s3://bucket/doc-1",
-    )
-    second = await service.create_document(
-        created_by="worker-1",
-        health_user_ci="patient-2",
-        clinic_name="clinic-1",
-        s3_url="s3://bucket/doc-2",
+    earlier = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    first, second = await service.create_documents(
+        [
+            {
+                "created_by": "worker-1",
+                "health_user_ci": "patient-2",
+                "clinic_name": "clinic-1",
+                "s3_url": "s3://bucket/doc-1",
+                "created_at": earlier,
+            },
+            {
+                "created_by": "worker-1",
+                "health_user_ci": "patient-2",
+                "clinic_name": "clinic-1",
+                "s3_url": "s3://bucket/doc-2",
+                "created_at": earlier + timedelta(minutes=1),
+            },
+        ]
     )
 
     docs = await service.list_documents_for_health_user("patient-2")
@@ -1,74 +1,88 @@
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from operator import attrgetter, itemgetter
+from unittest.mock import ANY, MagicMock, patch
 from uuid import UUID
 
 import pytest
+from fastapi import BackgroundTasks
 
-from nodo_documentos.rag.chunking.models import Chunk
-from nodo_documentos.rag.parsing.models import DocumentMetadata, PageInfo, ParsedDocument
+from nodo_documentos.api.routes.documents import create_document
+from nodo_documentos.api.schemas import DocumentCreateRequest
 from nodo_documentos.db.models import Document
+from nodo_documentos.db.repos.document import DocumentRepository
+from nodo_documentos.rag.chunking.models import Chunk
+from nodo_documentos.rag.encoding.cache import EmbeddingCache
+from nodo_documentos.rag.parsing.models import DocumentMetadata, PageInfo
+from nodo_documentos.services.document_service import DocumentService
 from nodo_documentos.services.models import ClinicalDocumentChunk
 from nodo_documentos.services.rag_service import RAGService
+from nodo_documentos.services.settings import services_settings
+
+QDRANT_ENABLED = bool(os.getenv("qdrant_host"))
+
+# Compared as one tuple per chunk (the repo has clinic_name, not clinic_id)
+_OWNERSHIP_FIELDS = ("document_id", "health_user_ci", "clinic_name", "created_by")
+_chunk_ownership = attrgetter(*_OWNERSHIP_FIELDS)
+_payload_ownership = itemgetter(*_OWNERSHIP_FIELDS)
+
+
+def _expected_ownership(document_id: str) -> tuple[str, str, str, str]:
+    return (document_id, "87654321", "Test Clinic", "12345678")
+
+
+# Pipeline steps in the order RAGService.index_document runs them
+_PIPELINE = ["parser", "chunker", "encoder", "vector_db"]
+
+
+def _attach_pipeline(rag_mocks) -> MagicMock:
+    """Parent the pipeline mocks under one manager that records call order."""
+    manager = MagicMock()
+    for name in _PIPELINE:
+        manager.attach_mock(getattr(rag_mocks, name), name)
+    return manager
+
+
+def _distinct_chunks(make_chunk, n_chunks: int) -> list[Chunk]:
+    """Chunks with unique texts, so deduplication cannot shrink the batch."""
+    return [make_chunk(chunk_id=i, text=f"c{i}") for i in range(n_chunks)]
+
+
+def _steps(manager: MagicMock) -> list[str]:
+    return [name.split(".")[0] for name, _, _ in manager.mock_calls]
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("presigner")
 async def test_document_creation_triggers_rag_indexing(
-    async_client, test_app, monkeypatch
+    async_client, override_rag, monkeypatch, rag_mocks, s3_objects
 ):
     """Test that creating a document triggers RAG indexing in background."""
+    monkeypatch.setattr(services_settings, "auto_index_documents", True)
+
     # Mock S3 download
-    mock_pdf_bytes = b"%PDF-1.4 fake pdf content"
     monkeypatch.setattr(
         "nodo_documentos.services.rag_service.download_from_s3",
-        lambda _: mock_pdf_bytes,
+        s3_objects.__getitem__,
     )
 
-    # Mock PDF parser
-    mock_parsed_doc = ParsedDocument(
-        id="test-doc-id",
-        document_name="test_document",
-        file_path=Path("/tmp/test.pdf"),
-        text="Test document content",
-        sections=[],
-        page_info=[],
-        metadata=DocumentMetadata(pages_processed=1, ocr_model="test-model"),
+    # Indexing runs on a worker thread, so signal completion back to the
+    # test loop thread-safely
+    loop = asyncio.get_running_loop()
+    indexed = asyncio.Event()
+    rag_mocks.vector_db.index_document.side_effect = (
+        lambda *_: loop.call_soon_threadsafe(indexed.set)
     )
-    mock_parser = MagicMock()
-    mock_parser.parse_pdf = MagicMock(return_value=mock_parsed_doc)
-
-    # Mock chunker
-    mock_chunks = [
-        Chunk(
-            chunk_id=0,
-            document_id="test-doc-id",
-            document_name="test_document",
-            text="Test chunk content",
-            section_title=None,
-            page_number=1,
-            token_count=5,
-        )
-    ]
-    mock_chunker = MagicMock()
-    mock_chunker.chunk_document = MagicMock(return_value=mock_chunks)
-
-    # Mock encoder
-    mock_embeddings = [[0.1, 0.2, 0.3] * 512]  # 1536-dim vector
-    mock_encoder = MagicMock()
-    mock_encoder.embed_many = MagicMock(return_value=mock_embeddings)
-
-    # Mock vector DB
-    mock_vector_db = MagicMock()
-    mock_vector_db.index_document = MagicMock()
 
     # Create RAG service with mocks
-    rag_service_instance = RAGService(
-        mock_vector_db, mock_parser, mock_chunker, mock_encoder
-    )
+    rag_service_instance = rag_mocks.service()
+    manager = _attach_pipeline(rag_mocks)
 
     # Override the dependency in the test app
-    from nodo_documentos.api.dependencies import rag_service
-
-    test_app.dependency_overrides[rag_service] = lambda: rag_service_instance
+    override_rag(rag_service_instance)
 
     # Create document
     payload = {
@@ -84,104 +98,80 @@ async def test_document_creation_triggers_rag_indexing(
     doc_id = created["doc_id"]
 
     # Wait for background task to execute
-    import asyncio
-
-    await asyncio.sleep(1.0)
+    await asyncio.wait_for(indexed.wait(), timeout=5.0)
 
-    # Verify RAG pipeline was called
-    assert mock_parser.parse_pdf.called
-    assert mock_chunker.chunk_document.called
-    assert mock_encoder.embed_many.called
-    assert mock_vector_db.index_document.called
+    # Verify RAG pipeline ran once, in order
+    assert _steps(manager) == _PIPELINE
+    rag_mocks.chunker.chunk_document.assert_called_once_with(rag_mocks.parsed_doc)
+    rag_mocks.vector_db.index_document.assert_called_once_with(
+        rag_mocks.parsed_doc, ANY, ANY
+    )
 
     # Verify clinical chunks were created with ownership metadata
-    call_args = mock_vector_db.index_document.call_args
+    call_args = rag_mocks.vector_db.index_document.call_args
     parsed_doc_arg, clinical_chunks_arg, embeddings_arg = call_args[0]
 
     assert len(clinical_chunks_arg) == 1
     clinical_chunk = clinical_chunks_arg[0]
     assert isinstance(clinical_chunk, ClinicalDocumentChunk)
-    assert clinical_chunk.document_id == doc_id
-    assert clinical_chunk.health_user_ci == "87654321"
-    assert clinical_chunk.clinic_name == "Test Clinic"
-    assert clinical_chunk.created_by == "12345678"
-
-    # Cleanup
-    test_app.dependency_overrides.pop(rag_service, None)
+    assert _chunk_ownership(clinical_chunk) == _expected_ownership(doc_id)
 
 
 @pytest.mark.asyncio
 async def test_rag_indexing_failure_does_not_break_document_creation(
-    async_client, monkeypatch
+    async_session, monkeypatch, rag_mocks
 ):
     """Test that RAG indexing failures don't prevent document creation."""
+    monkeypatch.setattr(services_settings, "auto_index_documents", True)
+
     # Mock S3 download to fail
+    def _fail_download(_url):
+        raise RuntimeError("S3 download failed")
+
     monkeypatch.setattr(
-        "nodo_documentos.services.rag_service.download_from_s3",
-        lambda _: (_ for _ in ()).throw(Exception("S3 download failed")),
+        "nodo_documentos.services.rag_service.download_from_s3", _fail_download
     )
 
-    # Create document
-    payload = {
-        "created_by": "12345678",
-        "health_user_ci": "87654321",
-        "clinic_name": "Test Clinic",
-        "s3_url": "s3://bucket/test-doc.pdf",
-    }
+    # Call the endpoint directly; the HTTP path is covered by the trigger test
+    payload = DocumentCreateRequest(
+        created_by="12345678",
+        health_user_ci="87654321",
+        clinic_name="Test Clinic",
+        s3_url="s3://bucket/test-doc.pdf",
+    )
+    background_tasks = BackgroundTasks()
+    created = await create_document(
+        payload,
+        background_tasks,
+        service=DocumentService(DocumentRepository(async_session)),
+        rag_service_instance=rag_mocks.service(),
+    )
+
+    # Run the queued indexing task the way Starlette would after responding
+    assert len(background_tasks.tasks) == 1
+    await background_tasks()
 
-    response = await async_client.post("/api/documents", json=payload)
     # Document should still be created successfully
-    assert response.status_code == 201
-    created = response.json()
-    assert created["doc_id"]
+    assert created.doc_id
+    rag_mocks.parser.parse_pdf.assert_not_called()
+    rag_mocks.vector_db.index_document.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_rag_service_index_document_integration():
+@pytest.mark.parametrize("n_chunks", [1, 32, 256])
+async def test_rag_service_index_document_integration(
+    rag_mocks, s3_objects, make_chunk, n_chunks
+):
     """Test RAG service index_document method directly."""
-    from nodo_documentos.db.models import Document
-    from nodo_documentos.services.rag_service import RAGService
-
-    # Create mock components
-    mock_vector_db = MagicMock()
-    mock_parser = MagicMock()
-    mock_chunker = MagicMock()
-    mock_encoder = MagicMock()
-
-    # Setup mocks
-    mock_pdf_bytes = b"%PDF-1.4 fake pdf content"
-    mock_parsed_doc = ParsedDocument(
-        id="test-doc-id",
-        document_name="test_document",
-        file_path=Path("/tmp/test.pdf"),
-        text="Test document content",
-        sections=[],
-        page_info=[],
-        metadata=DocumentMetadata(pages_processed=1, ocr_model="test-model"),
-    )
-    mock_chunks = [
-        Chunk(
-            chunk_id=0,
-            document_id="test-doc-id",
-            document_name="test_document",
-            text="Test chunk",
-            section_title=None,
-            page_number=1,
-            token_count=2,
-        )
-    ]
-    mock_embeddings = [[0.1] * 1536]
-
-    mock_parser.parse_pdf.return_value = mock_parsed_doc
-    mock_chunker.chunk_document.return_value = mock_chunks
-    mock_encoder.embed_many.return_value = mock_embeddings
+    chunks = _distinct_chunks(make_chunk, n_chunks)
+    rag_mocks.chunker.chunk_document.return_value = chunks
+    rag_mocks.encoder.embed_many.return_value = [rag_mocks.embedding] * n_chunks
 
     # Create service
-    service = RAGService(mock_vector_db, mock_parser, mock_chunker, mock_encoder)
+    service = rag_mocks.service()
+    manager = _attach_pipeline(rag_mocks)
 
     # Create test document
-    from datetime import datetime
-
     document = Document(
         doc_id=UUID("11111111-2222-3333-4444-555555555555"),
         created_by="12345678",
@@ -192,83 +182,200 @@ async def test_rag_service_index_document_integration():
     )
 
     # Mock S3 download
-    with patch("nodo_documentos.services.rag_service.download_from_s3") as mock_download:
-        mock_download.return_value = mock_pdf_bytes
+    with patch(
+        "nodo_documentos.services.rag_service.download_from_s3",
+        side_effect=s3_objects.__getitem__,
+    ) as mock_download:
+        manager.attach_mock(mock_download, "download")
 
         # Index document
         await service.index_document(document)
 
-        # Verify pipeline execution
-        assert mock_download.called
-        assert mock_parser.parse_pdf.called
-        assert mock_chunker.chunk_document.called
-        assert mock_encoder.embed_many.called
-        assert mock_vector_db.index_document.called
+        # Verify pipeline execution order; every chunk is embedded in a
+        # single batched call
+        assert _steps(manager) == ["download", *_PIPELINE]
+        mock_download.assert_called_once_with("s3://bucket/test.pdf")
+        rag_mocks.chunker.chunk_document.assert_called_once_with(rag_mocks.parsed_doc)
+        rag_mocks.vector_db.index_document.assert_called_once_with(
+            rag_mocks.parsed_doc, ANY, ANY
+        )
+        assert len(rag_mocks.encoder.embed_many.call_args[0][0]) == n_chunks
 
         # Verify clinical chunks have ownership metadata
-        call_args = mock_vector_db.index_document.call_args
+        call_args = rag_mocks.vector_db.index_document.call_args
         _, clinical_chunks, _ = call_args[0]
 
-        assert len(clinical_chunks) == 1
-        assert clinical_chunks[0].document_id == "11111111-2222-3333-4444-555555555555"
-        assert clinical_chunks[0].health_user_ci == "87654321"
-        assert clinical_chunks[0].clinic_name == "Test Clinic"
-        assert clinical_chunks[0].created_by == "12345678"
+        expected = _expected_ownership("11111111-2222-3333-4444-555555555555")
+        assert [_chunk_ownership(chunk) for chunk in clinical_chunks] == [
+            expected
+        ] * n_chunks
+
+
+@pytest.mark.asyncio
+async def test_rag_service_embeds_duplicate_chunk_texts_once(
+    rag_mocks, s3_objects, make_chunk
+):
+    """Identical chunk texts are embedded once and shared across positions."""
+    rag_mocks.chunker.chunk_document.return_value = [
+        make_chunk(chunk_id=i, text=text)
+        for i, text in enumerate(["Header", "Body", "Header"])
+    ]
+    rag_mocks.encoder.embed_many.return_value = [[1.0, 0.0], [0.0, 1.0]]
+
+    service = rag_mocks.service()
+    document = Document(
+        doc_id=UUID("11111111-2222-3333-4444-555555555555"),
+        created_by="12345678",
+        health_user_ci="87654321",
+        clinic_name="Test Clinic",
+        s3_url="s3://bucket/test.pdf",
+    )
+
+    with patch(
+        "nodo_documentos.services.rag_service.download_from_s3",
+        side_effect=s3_objects.__getitem__,
+    ):
+        await service.index_document(document)
+
+    rag_mocks.encoder.embed_many.assert_called_once_with(["Header", "Body"])
+    _, clinical_chunks, embeddings = rag_mocks.vector_db.index_document.call_args[0]
+    assert len(clinical_chunks) == 3
+    assert embeddings.tolist() == [[1.0, 0.0], [0.0, 1.0], [1.0, 0.0]]
+
+
+@pytest.mark.asyncio
+async def test_rag_service_reuses_cached_embeddings(
+    tmp_path, rag_mocks, s3_objects, make_chunk
+):
+    """Re-indexing text already in the embedding cache skips the encoder."""
+    rag_mocks.chunker.chunk_document.return_value = [
+        make_chunk(text="Shared consent form", token_count=3)
+    ]
+    rag_mocks.encoder.embed_many.return_value = [[0.5, 0.25]]
+
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", model="test-model")
+    service = rag_mocks.service(embedding_cache=cache)
+    document = Document(
+        doc_id=UUID("11111111-2222-3333-4444-555555555555"),
+        created_by="12345678",
+        health_user_ci="87654321",
+        clinic_name="Test Clinic",
+        s3_url="s3://bucket/test.pdf",
+    )
+
+    with patch(
+        "nodo_documentos.services.rag_service.download_from_s3",
+        side_effect=s3_objects.__getitem__,
+    ):
+        await service.index_document(document)
+        await service.index_document(document)
+
+    rag_mocks.encoder.embed_many.assert_called_once_with(["Shared consent form"])
+    assert rag_mocks.vector_db.index_document.call_count == 2
+    _, _, embeddings = rag_mocks.vector_db.index_document.call_args[0]
+    assert embeddings.tolist() == [[0.5, 0.25]]
+    cache.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.perf
+async def test_index_document_time_and_memory_budget(
+    rag_mocks, s3_objects, make_chunk
+):
+    """Fully mocked indexing stays fast, lean and roughly linear in chunk count."""
+    service = rag_mocks.service()
+    document = Document(
+        doc_id=UUID("11111111-2222-3333-4444-555555555555"),
+        created_by="12345678",
+        health_user_ci="87654321",
+        clinic_name="Test Clinic",
+        s3_url="s3://bucket/test.pdf",
+    )
+
+    elapsed: dict[int, float] = {}
+    with patch(
+        "nodo_documentos.services.rag_service.download_from_s3",
+        side_effect=s3_objects.__getitem__,
+    ):
+        # Warm up imports and validators outside the measurements
+        await service.index_document(document)
+
+        for n_chunks in (64, 512):
+            chunks = _distinct_chunks(make_chunk, n_chunks)
+            rag_mocks.chunker.chunk_document.return_value = chunks
+            rag_mocks.encoder.embed_many.return_value = [rag_mocks.embedding] * n_chunks
+
+            started = time.perf_counter()
+            await service.index_document(document)
+            elapsed[n_chunks] = time.perf_counter() - started
+            assert elapsed[n_chunks] < 0.5, "index_document slowed down"
+
+            # Measured separately; tracing inflates wall time
+            tracemalloc.start()
+            try:
+                await service.index_document(document)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            assert peak / n_chunks < 64 * 1024, "per-chunk allocations grew"
+
+    # 8x the chunks may cost up to 16x the time; more means super-linear growth
+    assert elapsed[512] < 16 * elapsed[64] + 0.01
+
+
+async def _wait_for_chunks(vector_db, document_id: str, timeout: float = 5.0):
+    """Poll Qdrant until the document's chunks are visible or the timeout ends."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not (chunks := vector_db.get_chunks_for_document(document_id)):
+        if loop.time() >= deadline:
+            break
+        await asyncio.sleep(0.05)
+    return chunks
 
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_rag_indexing_stores_chunks_in_qdrant(monkeypatch):
+@pytest.mark.xdist_group("integration")
+@pytest.mark.skipif(not QDRANT_ENABLED, reason="Qdrant not configured")
+async def test_rag_indexing_stores_chunks_in_qdrant(
+    monkeypatch, rag_components, s3_objects, make_parsed
+):
     """
     Integration test that verifies chunks are actually stored in Qdrant.
 
     This test uses real Qdrant, OpenAI embeddings, but mocks S3 and PDF parsing
     to avoid external API dependencies.
     """
-    import os
-
-    # Skip if Qdrant is not configured
-    if not os.getenv("qdrant_host"):
-        pytest.skip("Qdrant not configured - skipping integration test")
-
-    from datetime import datetime
-    from uuid import UUID
-
-    from nodo_documentos.rag.chunking.chunker import get_chunker
-    from nodo_documentos.rag.encoding.encoder import get_encoder
-    from nodo_documentos.rag.parsing.parser import get_parser
-    from nodo_documentos.rag.vector_db.db import get_vector_db
-    from nodo_documentos.services.rag_service import RAGService
-
-    # Create real RAG service components
-    vector_db = get_vector_db()
-    pdf_parser = get_parser()
-    pdf_chunker = get_chunker()
-    encoder = get_encoder()
+    # Real RAG service components, shared across the session
+    vector_db, pdf_parser, pdf_chunker, encoder = rag_components
 
     # Mock S3 download with a minimal PDF
-    mock_pdf_bytes = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
     monkeypatch.setattr(
         "nodo_documentos.services.rag_service.download_from_s3",
-        lambda _: mock_pdf_bytes,
+        s3_objects.__getitem__,
     )
 
     # Mock PDF parser to return a simple parsed document
-    mock_parsed_doc = ParsedDocument(
+    mock_parsed_doc = make_parsed(
         id="test-integration-doc",
         document_name="test_integration",
-        file_path=Path("/tmp/test.pdf"),
-        text="# Test Document\n\nThis is a test document for integration testing.\n\n## Section 1\n\nSome content here.",
-        sections=[],
-        page_info=[
-            PageInfo(page_number=1, char_start=0, char_end=100)
-        ],
+        text=(
+            "# Test Document\n\nThis is a test document for integration testing."
+            "\n\n## Section 1\n\nSome content here."
+        ),
+        page_info=[PageInfo(page_number=1, char_start=0, char_end=100)],
         metadata=DocumentMetadata(pages_processed=1, ocr_model="test"),
     )
     monkeypatch.setattr(pdf_parser, "parse_pdf", lambda _: mock_parsed_doc)
 
     # Create RAG service
-    service = RAGService(vector_db, pdf_parser, pdf_chunker, encoder)
+    service = RAGService(
+        vector_db=vector_db,
+        pdf_parser=pdf_parser,
+        pdf_chunker=pdf_chunker,
+        encoder=encoder,
+    )
 
     # Create test document
     test_doc_id = UUID("99999999-9999-9999-9999-999999999999")
@@ -284,24 +391,19 @@ async def test_rag_indexing_stores_chunks_in_qdrant(monkeypatch):
     # Index document
     await service.index_document(document)
 
-    # Wait a bit for async operations
-    import asyncio
-
-    await asyncio.sleep(2.0)
-
     # Verify chunks are stored in Qdrant
-    chunks = vector_db.get_chunks_for_document(str(test_doc_id))
+    chunks = await _wait_for_chunks(vector_db, str(test_doc_id))
 
     assert len(chunks) > 0, "No chunks found in Qdrant for the document"
     print(f"✅ Found {len(chunks)} chunks in Qdrant for document {test_doc_id}")
 
     # Verify ownership metadata
+    expected = _expected_ownership(str(test_doc_id))
+    assert [_payload_ownership(point.payload) for point in chunks] == [
+        expected
+    ] * len(chunks)
     for chunk_point in chunks:
         payload = chunk_point.payload
-        assert payload["document_id"] == str(test_doc_id)
-        assert payload["health_user_ci"] == "87654321"
-        assert payload["clinic_name"] == "Test Clinic"
-        assert payload["created_by"] == "12345678"
         assert "text" in payload
         assert "chunk_id" in payload
         print(f"✅ Chunk {payload['chunk_id']} has correct ownership metadata")
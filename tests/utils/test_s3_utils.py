@@ -0,0 +1,27 @@
+from nodo_documentos.utils import s3_utils
+from nodo_documentos.utils.s3_utils import generate_presigned_get_url
+
+
+def test_presigned_get_url_is_reused_within_half_lifetime(presigner, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(s3_utils.time, "monotonic", lambda: now)
+
+    first = generate_presigned_get_url(s3_url="s3://bucket/doc.pdf", expires_in=600)
+    now += 200
+    second = generate_presigned_get_url(s3_url="s3://bucket/doc.pdf", expires_in=600)
+
+    assert presigner.get_keys == ["doc.pdf"]
+    assert second.url == first.url
+    assert second.expires_in == 400
+
+
+def test_presigned_get_url_is_resigned_past_half_lifetime(presigner, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(s3_utils.time, "monotonic", lambda: now)
+
+    generate_presigned_get_url(key="doc.pdf", expires_in=600)
+    now += 301
+    refreshed = generate_presigned_get_url(key="doc.pdf", expires_in=600)
+
+    assert presigner.get_keys == ["doc.pdf", "doc.pdf"]
+    assert refreshed.expires_in == 600